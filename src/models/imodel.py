@@ -34,6 +34,8 @@ class IModel(ABC):
     This is an interface implementation for the models. 
     For the details on the definition and functionalities please refer to the documentation guide.  
     '''
+    # Empty slots so that the models declaring __slots__ do not get a per-instance __dict__ from the interface
+    __slots__ = ()
     
     @property
     @abstractmethod
@@ -182,6 +182,9 @@ class ModelDataGenerator(IModel):
         @param[in] _event
             Event to be logged 
         """
+        if not self.__logInfoEnabled:
+            return
+        
         self.__logger.write_Log(_event + f" dataID: {_data.id}. " +
             f"queueSize: {self.__get_QueueSize()}" \
             , ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
@@ -242,6 +245,8 @@ class ModelDataGenerator(IModel):
         '''
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
         
         self.__dataPoissonLambda = _dataPoissonLambda
         
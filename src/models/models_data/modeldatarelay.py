@@ -19,6 +19,9 @@ class ModelDataRelay(IModel):
     __dependencies = [['ModelGenericRadio', 'ModelLoraRadio', 'ModelDownlinkRadio', 'ModelAggregatorRadio', 'ModelImagingRadio']]  
     __logger: ILogger
     
+    # One instance is created per node. Declaring the instance attributes as slots keeps them out of a per-instance dictionary
+    __slots__ = ('__ownernode', '__logger', '__radioRxQueue', '__radioTxQueue', '__radioModel')
+    
     @property
     def iName(self) -> str:
         """
@@ -118,14 +121,13 @@ class ModelDataRelay(IModel):
             The API return
         This model does not have any API. So, this method does nothing.
         '''
-        _ret = None
-
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, **_kwargs)
-        except Exception as e:
-            print(f"[ModelDataRelay]: An unhandled API request has been received by {self.__ownernode.nodeID}:", e)
+        _handler = self.__apiHandlerDictionary.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        # Errors raised by the handler are not swallowed here so that they surface in the simulation
+        return _handler(self, **_kwargs)
     
     def Execute(self):
         '''
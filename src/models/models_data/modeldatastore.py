@@ -159,12 +159,46 @@ class ModelDataStore(IModel):
         self.__logger.write_Log(f"Current queue size: {self.__get_QueueSize()}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
         return _ret
         
+    def __add_Data_Bulk(self, **_kwargs):
+        """
+        @desc
+            This method adds a batch of data to the data queue of the model in one call. 
+            The data which do not fit in the queue are dropped
+        @param[in] _kwargs
+            Keyworded arguments
+            @key _dataList
+                Iterable of the data to be added to the queue
+        @return
+            Number of data added successfully
+        """
+        if "_dataList" not in _kwargs:
+            raise Exception("Missing keyword argument '_dataList'")
+        
+        _numAdded = 0
+        _logEnabled = self.__logInfoEnabled
+        
+        for _data in _kwargs["_dataList"]:
+            if self.__queue.full():
+                if _logEnabled:
+                    self.__log_Message(_data, "Dropping")
+            else:
+                if _logEnabled:
+                    self.__log_Message(_data, "Queuing")
+                self.__queue.put(_data)
+                _numAdded += 1
+        
+        #Let's log the queue size once for the whole batch
+        if _logEnabled and _numAdded > 0:
+            self.__logger.write_Log(f"Current queue size: {self.__get_QueueSize()}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+        return _numAdded
+        
     # API dictionary where API name is the key and handler function is the value
     __apiHandlerDictionary = {
         "get_Data": __get_Data,
         "get_Queue": __get_Queue,
         "get_QueueSize": __get_QueueSize,
-        "add_Data": __add_Data
+        "add_Data": __add_Data,
+        "add_Data_Bulk": __add_Data_Bulk
     }
     
     def call_APIs(
@@ -224,6 +258,8 @@ class ModelDataStore(IModel):
         '''
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
         self.__queue = queue.Queue(_queueSize)
         
 def init_ModelDataStore(
@@ -32,10 +32,13 @@ class ModelFovTimeBased(IModel):
     __logger: ILogger
     
     __nodeToTimes = {} #Static variable to hold the pass times for each node. Node id is the key and the value is a numpy array of (start, end, nodeID, ENodeType) tuples 
-    __nodeToNode = {} #static variable to see if this pair of nodes has been calculated. Node id is the key and the value is a list of node ids
+    __nodeToNode = {} #static variable to see if this pair of nodes has been calculated. Node id is the key and the value is a set of node ids
     __preloaded = False #static variable to see if the pass times have been preloaded
     __nodeToTimesLock = threading.Lock() #Lock for the static variable
     
+    # One instance is created per node. Declaring the instance attributes as slots keeps them out of a per-instance dictionary
+    __slots__ = ('__ownernode', '__logger', '__minElevation', '__myTopology', '__targetNodesCache')
+    
     @property
     def iName(self) -> str:
         """
@@ -96,6 +99,16 @@ class ModelFovTimeBased(IModel):
         '''
         return self.__dependencies
     
+    @property
+    def minElevation(self) -> float:
+        """
+        @type
+            float
+        @desc
+            Minimum elevation angle of view in degrees
+        """
+        return self.__minElevation
+    
     def __str__(self) -> str:
         return "".join(["Model name: ", self.iName, ", " , "Model tag: ", self.__modeltag.__str__()])
 
@@ -137,9 +150,8 @@ class ModelFovTimeBased(IModel):
         _datetime = _myTime.to_datetime()
         _targetNodeInt = [i.value for i in _targetNodeTypes]
         
-        _fpDesiredInds = np.argwhere((_fp[:,0] <= _datetime) & (_fp[:,1] >= _datetime) & (np.isin(_fp[:,3], _targetNodeInt)))
-        _fpDesiredInds = _fpDesiredInds.flatten()
-        _ret = [i[2] for i in _fp[_fpDesiredInds]]
+        _fpDesiredInds = np.nonzero((_fp[:,0] <= _datetime) & (_fp[:,1] >= _datetime) & (np.isin(_fp[:,3], _targetNodeInt)))[0]
+        _ret = _fp[_fpDesiredInds, 2].tolist()
         
         #if len(_fpDesiredInds) > 0 and _myTime not in _kwargs:
         #    #Let's update the list. We don't need to keep the old ones 
@@ -178,87 +190,115 @@ class ModelFovTimeBased(IModel):
         """              
         _targetTypes = _kwargs['_targetNodeTypes']
         
-        # Get the node topology ID and find the corresponding topology (node list) from the manager
-        _topologyID = self.__ownernode.topologyID
-        _topologies = self.__ownernode.managerInstance.req_Manager(EManagerReqType.GET_TOPOLOGIES)
-        
-        _myTopology:ITopology = None
-        for _topology in _topologies:
-            if _topology.id == _topologyID:
-                _myTopology = _topology
-                break
-        
-        assert _myTopology is not None, "[Simulation Error]: A topology should have been found for an existing node"
-        
         #let's find all the target nodes
-        _targetNodes = [_myTopology.get_NodesOfAType(_targetType) for _targetType in _targetTypes]
-        _targetNodes = [item for sublist in _targetNodes for item in sublist]
+        _targetNodes = self.__get_TargetNodes(_targetTypes)
         
         #This should be relatively thread safe. The worst that can happen is that we will find the same pass twice
         #That has less of an impact than locking the whole thing
         _currentOnes = ModelFovTimeBased.__nodeToNode[self.__ownernode.nodeID]
         _nodesToCheck = [_node for _node in _targetNodes if _node.nodeID not in _currentOnes]
         
-        #let's find the passes
+        if len(_nodesToCheck) == 0:
+            return
+        
+        #Same as above
         for _node in _nodesToCheck:
-                #Same as above
-                ModelFovTimeBased.__nodeToNode[self.__ownernode.nodeID].append(_node.nodeID)
-                ModelFovTimeBased.__nodeToNode[_node.nodeID].append(self.__ownernode.nodeID)
+            ModelFovTimeBased.__nodeToNode[self.__ownernode.nodeID].add(_node.nodeID)
+            ModelFovTimeBased.__nodeToNode[_node.nodeID].add(self.__ownernode.nodeID)
+        
+        #let's find the passes
+        _results = [self.__compute_Passes(_node) for _node in _nodesToCheck]
+        
+        #Let's collect the new rows of every node so that each array is appended and sorted only once
+        _newRows = {}
+        for _node, _satelliteNode, _groundStationNode, _passes in _results:
+            for _pass in _passes:
+                self.__log_Pass(_node, _pass[0], _pass[1])
+            
+            if len(_passes) > 0:
+                _newRows.setdefault(_satelliteNode.nodeID, []).extend([(ps[0].to_datetime(), ps[1].to_datetime(), _groundStationNode.nodeID, _groundStationNode.nodeType.value) for ps in _passes])
+                _newRows.setdefault(_groundStationNode.nodeID, []).extend([(ps[0].to_datetime(), ps[1].to_datetime(), _satelliteNode.nodeID, _satelliteNode.nodeType.value) for ps in _passes])
+        
+        if len(_newRows) == 0:
+            return
+        
+        #Let's acquire the lock
+        #We need a lock here because the static variable is shared among all the instances of this class
+        with ModelFovTimeBased.__nodeToTimesLock:
+            for _nodeID, _rows in _newRows.items():
+                #let's get the original values. These are numpy arrays
+                _orig = ModelFovTimeBased.__nodeToTimes[_nodeID]
                 
-                #Let's find out what kind of node this is:
-                if _orbitModel := self.__ownernode.has_ModelWithTag(EModelTag.ORBITAL):
-                    _satelliteNode = self.__ownernode
-                    _groundStationNode = _node
+                #Add the new passes
+                if _orig is None:
+                    _new = np.array(_rows)
                 else:
-                    _satelliteNode = _node
-                    _orbitModel = _node.has_ModelWithTag(EModelTag.ORBITAL)
-                    _groundStationNode = self.__ownernode
-                    
-                _minElevation = max(self.__minElevation, _otherModel.__minElevation if (_otherModel := _node.has_ModelWithName(self.iName)) else 0)
-                _startTime = max(self.__ownernode.simStartTime, self.__ownernode.timestamp)
-                _passes = _orbitModel.call_APIs("get_Passes", _gs = _groundStationNode, _start = _startTime, _end = self.__ownernode.simEndTime, _minElevation=_minElevation)
-
-                for _pass in _passes:
-                    self.__log_Pass(_node, _pass[0], _pass[1])
-
-                if _passes is None:
-                    raise Exception(f"[FovTimeBased Error]: The passes could not be found for the nodes {_node.nodeID} and {self.__ownernode.nodeID}. If there is no api handler for the get_Passes API. ")
+                    _new = np.append(_orig, _rows, axis=0)
+                assert _new.shape[1] == 4, "[FovTimeBased Error]: The shape of the pass array is not correct"
                 
-                if len(_passes) > 0:
-                    #now let's add the passes to the dictionary
-                    _satPasses = [(ps[0].to_datetime(), ps[1].to_datetime(), _groundStationNode.nodeID, _groundStationNode.nodeType.value) for ps in _passes]
-                    _gsPasses = [(ps[0].to_datetime(), ps[1].to_datetime(), _satelliteNode.nodeID, _satelliteNode.nodeType.value) for ps in _passes]
-                    
-                    #Let's acquire the lock
-                    #We need a lock here because the static variable is shared among all the instances of this class
-                    ModelFovTimeBased.__nodeToTimesLock.acquire()
-                    
-                    #let's get the original values. These are numpy arrays
-                    _origSat = ModelFovTimeBased.__nodeToTimes[_satelliteNode.nodeID]
-                    _origGs = ModelFovTimeBased.__nodeToTimes[_groundStationNode.nodeID]
-                    
-                    #Add the new passes
-                    if _origSat is None:
-                        _newSat = np.array(_satPasses)    
-                    else:                    
-                        _newSat = np.append(_origSat, _satPasses, axis=0)
-                    assert _newSat.shape[1] == 4, "[FovTimeBased Error]: The shape of the newSat array is not correct"
-                    
-                    if _origGs is None:
-                        _newGs = np.array(_gsPasses)
-                    else:
-                        _newGs = np.append(_origGs, _gsPasses, axis=0)
-                    assert _newGs.shape[1] == 4, "[FovTimeBased Error]: The shape of the newGs array is not correct"
-                    
-                    #Let's sort the rows by the start time
-                    _newSat = _newSat[_newSat[:,0].argsort()]
-                    _newGs = _newGs[_newGs[:,0].argsort()]
-                    
-                    #Now let's update the dictionary
-                    ModelFovTimeBased.__nodeToTimes[_satelliteNode.nodeID] = _newSat
-                    ModelFovTimeBased.__nodeToTimes[_groundStationNode.nodeID] = _newGs
-                    
-                    ModelFovTimeBased.__nodeToTimesLock.release()                
+                #Let's sort the rows by the start time and update the dictionary
+                ModelFovTimeBased.__nodeToTimes[_nodeID] = _new[_new[:,0].argsort()]
+    
+    def __get_TargetNodes(self, _targetTypes) -> 'list[INode]':
+        """
+        @desc
+            This method returns the nodes of the given types in the topology of the owner node.
+            The topology and its members do not change during the simulation, so the result is cached per set of node types.
+        @param[in]  _targetTypes
+            List of the node types that we are interested in
+        @return
+            List of the nodes of the target types
+        """
+        _key = tuple(_targetTypes)
+        _targetNodes = self.__targetNodesCache.get(_key)
+        if _targetNodes is not None:
+            return _targetNodes
+        
+        if self.__myTopology is None:
+            # Get the node topology ID and find the corresponding topology (node list) from the manager
+            _topologyID = self.__ownernode.topologyID
+            _topologies = self.__ownernode.managerInstance.req_Manager(EManagerReqType.GET_TOPOLOGIES)
+            
+            for _topology in _topologies:
+                if _topology.id == _topologyID:
+                    self.__myTopology = _topology
+                    break
+            
+            assert self.__myTopology is not None, "[Simulation Error]: A topology should have been found for an existing node"
+        
+        _targetNodes = [_node for _targetType in _targetTypes for _node in self.__myTopology.get_NodesOfAType(_targetType)]
+        self.__targetNodesCache[_key] = _targetNodes
+        return _targetNodes
+    
+    def __compute_Passes(self, _node: INode) -> tuple:
+        """
+        @desc
+            This method computes the passes between the owner node and one target node.
+            It does not touch the static variables. The caller merges the passes into them
+        @param[in]  _node
+            The target node
+        @return
+            Tuple of (target node, satellite node, ground node, list of (start Time, end Time) passes)
+        """
+        #Let's find out what kind of node this is:
+        if _orbitModel := self.__ownernode.has_ModelWithTag(EModelTag.ORBITAL):
+            _satelliteNode = self.__ownernode
+            _groundStationNode = _node
+        else:
+            _satelliteNode = _node
+            _orbitModel = _node.has_ModelWithTag(EModelTag.ORBITAL)
+            _groundStationNode = self.__ownernode
+            
+        #The pass is only valid if both ends can see each other
+        _otherModel = _node.has_ModelWithName(self.iName)
+        _minElevation = max(self.__minElevation, _otherModel.minElevation if _otherModel is not None else 0)
+        _startTime = max(self.__ownernode.simStartTime, self.__ownernode.timestamp)
+        _passes = _orbitModel.call_APIs("get_Passes", _gs = _groundStationNode, _start = _startTime, _end = self.__ownernode.simEndTime, _minElevation=_minElevation)
+
+        if _passes is None:
+            raise Exception(f"[FovTimeBased Error]: The passes could not be found for the nodes {_node.nodeID} and {self.__ownernode.nodeID}. If there is no api handler for the get_Passes API. ")
+        
+        return (_node, _satelliteNode, _groundStationNode, _passes)
                 
     def __get_GlobalDictionary(self, **_kwargs):
         """
@@ -307,14 +347,13 @@ class ModelFovTimeBased(IModel):
         @return
             The API return
         '''
-        _ret = None
-
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, **_kwargs)
-        except Exception as e:
-            print(f"[ModelFoVTimeBased]: An unhandled API request has been received by {self.__ownernode.nodeID}: ", e)
+        _handler = self.__apiHandlerDictionary.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        # Errors raised by the handler are not swallowed here so that they surface in the simulation
+        return _handler(self, **_kwargs)
         
     def __init__(
         self, 
@@ -338,9 +377,12 @@ class ModelFovTimeBased(IModel):
         self.__logger = _loggerins
         self.__minElevation = _minElevation
         
+        self.__myTopology: ITopology = None #Topology of the owner node. Found on the first pass search
+        self.__targetNodesCache = {} #Target node lists keyed by the tuple of target node types
+        
                             
         ModelFovTimeBased.__nodeToTimes[self.__ownernode.nodeID] = None
-        ModelFovTimeBased.__nodeToNode[self.__ownernode.nodeID] = []
+        ModelFovTimeBased.__nodeToNode[self.__ownernode.nodeID] = set()
         
     def Execute(self) -> None:
         pass
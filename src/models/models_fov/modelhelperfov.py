@@ -17,6 +17,13 @@ from src.utils import Time, Location
 from src.sim.imanager import EManagerReqType
 from src.simlogging.ilogger import ILogger, ELogType
 import numpy as np
+from types import MethodType
+
+# Factor to convert radians to degrees
+RAD2DEG = 180.0 / np.pi
+
+# Number of nodes the elevation kernels process at a time
+ELEVATION_BLOCK_SIZE = 4096
 
 class ModelHelperFoV(IModel):
     """
@@ -147,109 +154,78 @@ class ModelHelperFoV(IModel):
             _myTime  = self.__ownernode.timestamp
             _myLocation = self.__ownernode.get_Position(_myTime)
         
-        # Get the node topology ID and find the corresponding topology (node list) from the manager
-        _topologyID = self.__ownernode.topologyID
-        _topologies = self.__ownernode.managerInstance.req_Manager(EManagerReqType.GET_TOPOLOGIES)
+        # Find the topology (node list) of the owner node from the manager only once. The topologies do not change during the simulation
+        if self.__myTopology is None:
+            _topologyID = self.__ownernode.topologyID
+            _topologies = self.__ownernode.managerInstance.req_Manager(EManagerReqType.GET_TOPOLOGIES)
+            
+            for _topology in _topologies:
+                if _topology.id == _topologyID:
+                    self.__myTopology = _topology
+                    break
         
-        _myTopology:ITopology = None
-        for _topology in _topologies:
-            if _topology.id == _topologyID:
-                _myTopology = _topology
-                break
+            assert self.__myTopology is not None, "[Simulation Error]: A topology should have been found for an existing node"
         
-        assert _myTopology is not None, "[Simulation Error]: A topology should have been found for an existing node"
+        # Keep a structure of arrays (node IDs, node types) for the topology instead of walking the node objects on every call
+        if self.__nodeIDs is None or len(self.__nodeList) != len(self.__myTopology.nodes):
+            self.__build_NodeCache(self.__myTopology)
         
-        # Based on the up or down view, the calculation differs. 
-        # So let's check the view first
-
-        # Load all the nodes having the target node types from the topology if the node is in space
-        _targetNodeTypes = set(_targetNodeTypes)
+        # Select the nodes having the target node types from the topology
+        # The requested node types are encoded as a bitmask over the ENodeType values and tested against the per node type bits
+        _requestBits = 0
+        for _targetNodeType in _targetNodeTypes:
+            _requestBits |= 1 << _targetNodeType.value
+        _targetMask = (self.__nodeTypeBits & np.uint64(_requestBits)) != 0
         
-        _myNodes = _myTopology.nodes # All the nodes in my topology
-        _nodeIDToElevation = np.zeros((len(_myNodes), 2)) # A 2D array for holding nodeID of view target nodes and corresponding elevation angle (initially zero)
-        _targetNodeLocations = np.zeros((len(_myNodes), 3)) # A array holding the position vectors of the target nodes
+        # Gather the position vectors of the target nodes from the topology in a single batch. 
+        # The scratch buffers are reused across the calls and only grow when more target nodes are requested
+        _numOfRequestedNodes = int(np.count_nonzero(_targetMask))
+        if self.__scratchLocations.shape[0] < _numOfRequestedNodes:
+            _capacity = max(_numOfRequestedNodes, 2 * self.__scratchLocations.shape[0])
+            self.__scratchLocations = np.empty((_capacity, 3))
+            self.__scratchElevations = np.empty(_capacity, dtype = np.float32)
         
-        _index = 0
-        for _node in _myNodes:
-            if _node.nodeType in _targetNodeTypes:
-                _targetNodePosition = _node.get_Position(_myTime)
-                if _targetNodePosition is not None:
-                    _nodeIDToElevation[_index] = (_node.nodeID, 0.0)
-                    _targetNodeLocations[_index] = _targetNodePosition.to_tuple()
-                    _index = _index + 1
+        _targetNodeLocations, _targetMask = self.__myTopology.get_Positions_At(_myTime, _targetMask, self.__scratchLocations) # A array holding the position vectors of the target nodes
         
-        _totalNumOfNodes = _index
+        _totalNumOfNodes = _targetNodeLocations.shape[0]
 
         if _totalNumOfNodes > 0:
-            # truncate the array as we took it as the size of all nodes in the topology
-            _nodeIDToElevation = _nodeIDToElevation[:_totalNumOfNodes, ]
-            _targetNodeLocations = _targetNodeLocations[:_totalNumOfNodes, ]
+            # Gather the node IDs of the target nodes
+            _targetNodeIDs = self.__nodeIDs[_targetMask]
+            _elevations = self.__scratchElevations[:_totalNumOfNodes]
            
-            if _isDownView:
-                # It's a down view. So all the target nodes should be on the ground
-                # calculate the Norm of ground node positions
-                _targetNodeLocationNorms = np.linalg.norm(_targetNodeLocations, axis=1)
-
-                # calculate the unit vector for ground node locations
-                _groundNodeLocationUnitVec = np.divide(_targetNodeLocations.T, _targetNodeLocationNorms).T
-                
-                # Calculate the delta position vectors for the satellite location and ground node locations
-                _deltaSatToGroundNodeLocations = _myLocation.to_tuple() - _targetNodeLocations # the delta vector between the positions of satellite and each ground node
-                
-                # calculate the Norm of delta position vectors
-                _deltaSatToGroundNodeLocationNorms = np.linalg.norm(_deltaSatToGroundNodeLocations, axis=1)
-
-                # calculate the unit vectors for delta position vectors
-                _deltaSatToGroundNodeLocationUnitVec = np.divide(
-                                                            _deltaSatToGroundNodeLocations.T, 
-                                                            _deltaSatToGroundNodeLocationNorms).T
-                # calculate the elevation angles
-                _elevations = np.arcsin( np.einsum(
-                                            'ij, ij->i', 
-                                            _deltaSatToGroundNodeLocationUnitVec, 
-                                            _groundNodeLocationUnitVec)) * 180/np.pi
-                
-                # copy the elevation angles against the node IDs
-                _nodeIDToElevation[:_totalNumOfNodes, 1:2] =  _elevations.reshape(_totalNumOfNodes, 1)
-                
-                self.__logger.write_Log(f"Node ID vs the elevation angle: \n {_nodeIDToElevation}", ELogType.LOGDEBUG, _myTime)
-
-            else:
-                # It's a down view. So all the target nodes should be in the space. So the viewer node must be on the ground
-                _groundNodeLoaction = np.asarray(_myLocation.to_tuple())
-
-                # calculate the Norm of ground node positions
-                _groundNodeLocationNorm = np.linalg.norm(_groundNodeLoaction)
-
-                # calculate the unit vector for ground node locations
-                _groundNodeLocationUnitVec = np.divide(_groundNodeLoaction.T, _groundNodeLocationNorm).T
-
-                # Calculate the delta position vectors for the satellite locations and ground node location
-                _deltaSatToGroundNodeLocations = _targetNodeLocations - _groundNodeLoaction # the delta vector between the positions of satellites and each ground node
-
-                # calculate the Norm of delta position vectors
-                _deltaSatToGroundNodeLocationNorms = np.linalg.norm(_deltaSatToGroundNodeLocations, axis=1)
-
-                # calculate the unit vectors for delta position vectors
-                _deltaSatToGroundNodeLocationUnitVec = np.divide(
-                                                            _deltaSatToGroundNodeLocations.T, 
-                                                            _deltaSatToGroundNodeLocationNorms).T
-                # calculate the elevation angles
-                _elevations = np.arcsin(np.dot(
-                                            _deltaSatToGroundNodeLocationUnitVec, 
-                                            _groundNodeLocationUnitVec)) * 180/np.pi
-                
-                # copy the elevation angles against the node IDs
-                _nodeIDToElevation[:_totalNumOfNodes, 1:2] =  _elevations.reshape(_totalNumOfNodes, 1)
-                self.__logger.write_Log(f"Node ID vs the elevation angle: \n {_nodeIDToElevation}", ELogType.LOGDEBUG, _myTime)                
+            # Based on the up or down view, the calculation differs
+            # For a down view, all the target nodes should be on the ground. 
+            # For an up view, all the target nodes should be in the space. So the viewer node must be on the ground
+            _computeElevations = compute_DownViewElevations if _isDownView else compute_UpViewElevations
+            _computeElevations(np.asarray(_myLocation.to_tuple()), _targetNodeLocations, _elevations)
+            
+            # Formatting the arrays is expensive. So the message is built only when the logger handles debug logs
+            if self.__logger.is_LogTypeEnabled(ELogType.LOGDEBUG):
+                self.__logger.write_Log(f"Node ID vs the elevation angle: \n {np.column_stack((_targetNodeIDs, _elevations))}", ELogType.LOGDEBUG, _myTime)
         else:
             self.__logger.write_Log("No target node types in the topology", ELogType.LOGWARN, _myTime)
             return _ret
         
-        #now we have the node ID vs elevation angle array. We need to find the nodes which are greater than our minimum elevation angle
-        _ret = _nodeIDToElevation[_nodeIDToElevation[:, 1] >= self.__minElevation, 0].tolist()
+        #now we have the elevation angles of the target nodes. We need to find the nodes which are greater than our minimum elevation angle
+        _ret = _targetNodeIDs[np.flatnonzero(_elevations >= self.__minElevation)].tolist()
         return _ret
     
+    def __build_NodeCache(self, _myTopology: ITopology):
+        """
+        @desc
+            This method builds the structure of arrays view of the nodes in the topology.
+            It holds the node IDs and the node type bits. The positions are fetched in a batch from the topology
+        @param[in]  _myTopology
+            Topology of the owner node
+        """
+        _myNodes = _myTopology.nodes
+        _numOfNodes = len(_myNodes)
+        
+        self.__nodeList = list(_myNodes)
+        self.__nodeIDs = np.fromiter((_node.nodeID for _node in _myNodes), dtype=np.int64, count=_numOfNodes)
+        self.__nodeTypeBits = np.fromiter((1 << _node.nodeType.value for _node in _myNodes), dtype=np.uint64, count=_numOfNodes) # one bit per ENodeType value
+    
     # API dictionary where API name is the key and handler function is the value
     __apiHandlerDictionary = {
         "get_View": __get_View
@@ -269,14 +245,12 @@ class ModelHelperFoV(IModel):
         @return
             The API return
         '''
-        _ret = None
-
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, **_kwargs)
-        except Exception as e:
-            print(f"[ModelHelperFov Warning]: An unhandled API request has been received by {self.__ownernode.nodeID}", e)
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        return _handler(**_kwargs)
         
     def __init__(
         self, 
@@ -298,7 +272,125 @@ class ModelHelperFoV(IModel):
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
         self.__minElevation = _minElevation
+        
+        # Structure of arrays view of the topology nodes. See __build_NodeCache
+        self.__myTopology: ITopology = None
+        self.__nodeList = []
+        self.__nodeIDs = None
+        self.__nodeTypeBits = None
+        
+        # Scratch buffers for the gathered target node locations and their elevation angles
+        self.__scratchLocations = np.empty((0, 3))
+        self.__scratchElevations = np.empty(0, dtype = np.float32) # single precision is ample for the angles in degrees
+
+def compute_DownViewElevations(
+        _viewerLocation: np.ndarray,
+        _targetLocations: np.ndarray,
+        _out: np.ndarray = None) -> np.ndarray:
+    """
+    @desc
+        This function computes the elevation angles (in degrees) of a viewer in the space as seen from the nodes on the ground.
+        The elevation angle is arcsin( (delta . ground) / (|delta| * |ground|) ), where delta is the vector from the ground node to the viewer.
+        It works on the coordinate columns in a single pass, so no (N, 3) temporary array is created.
+        The nodes are processed in blocks of ELEVATION_BLOCK_SIZE, so the scratch arrays stay in the cache for large topologies.
+    @param[in]  _viewerLocation
+        Position vector of the viewer (3,)
+    @param[in]  _targetLocations
+        Position vectors of the ground nodes (N, 3)
+    @param[out]  _out
+        Optional array of length N to write the elevation angles into. Float64 by default
+    @return
+        Array of the elevation angles
+    """
+    _numOfNodes = _targetLocations.shape[0]
+    if _out is None:
+        _out = np.empty(_numOfNodes)
+    
+    _blockSize = min(_numOfNodes, ELEVATION_BLOCK_SIZE)
+    _scratchBlock = np.empty(_blockSize)
+    _projectionsBlock = np.empty(_blockSize)
+    _deltaNormsBlock = np.empty(_blockSize)
+    _targetNormsBlock = np.empty(_blockSize)
+    
+    for _start in range(0, _numOfNodes, ELEVATION_BLOCK_SIZE):
+        _stop = min(_start + ELEVATION_BLOCK_SIZE, _numOfNodes)
+        _length = _stop - _start
+        _scratch = _scratchBlock[:_length]
+        _projections = _projectionsBlock[:_length]
+        _deltaNorms = _deltaNormsBlock[:_length]
+        _targetNorms = _targetNormsBlock[:_length]
+        _projections[:] = 0.0
+        _deltaNorms[:] = 0.0
+        _targetNorms[:] = 0.0
+        
+        for _axis in range(3):
+            _target = _targetLocations[_start:_stop, _axis]
+            
+            # delta component of this axis
+            np.subtract(_viewerLocation[_axis], _target, out = _scratch)
+            _deltaNorms += _scratch * _scratch
+            
+            # projection of delta on the ground node location
+            _scratch *= _target
+            _projections += _scratch
+            
+            np.multiply(_target, _target, out = _scratch)
+            _targetNorms += _scratch
+        
+        np.multiply(_deltaNorms, _targetNorms, out = _deltaNorms)
+        np.sqrt(_deltaNorms, out = _deltaNorms)
+        np.divide(_projections, _deltaNorms, out = _projections)
+        
+        # the projections are computed in double precision. The output can be narrower, e.g. float32
+        np.arcsin(_projections, out = _out[_start:_stop])
+    
+    _out *= RAD2DEG
+    return _out
+
+def compute_UpViewElevations(
+        _viewerLocation: np.ndarray,
+        _targetLocations: np.ndarray,
+        _out: np.ndarray = None) -> np.ndarray:
+    """
+    @desc
+        This function computes the elevation angles (in degrees) of the nodes in the space as seen from a viewer on the ground.
+        The viewer location is a single vector, so the projection is a matrix-vector product divided by the scalar norm.
+        The nodes are processed in blocks of ELEVATION_BLOCK_SIZE, so the temporaries stay in the cache for large constellations.
+    @param[in]  _viewerLocation
+        Position vector of the viewer (3,)
+    @param[in, out]  _targetLocations
+        Position vectors of the nodes in the space (N, 3). It is overwritten with the delta vectors from the viewer
+    @param[out]  _out
+        Optional array of length N to write the elevation angles into. Float64 by default
+    @return
+        Array of the elevation angles
+    """
+    _numOfNodes = _targetLocations.shape[0]
+    if _out is None:
+        _out = np.empty(_numOfNodes)
+    
+    # calculate the Norm of ground node position
+    _viewerLocationNorm = np.linalg.norm(_viewerLocation)
+    
+    for _start in range(0, _numOfNodes, ELEVATION_BLOCK_SIZE):
+        _stop = min(_start + ELEVATION_BLOCK_SIZE, _numOfNodes)
+        
+        # Calculate the delta position vectors for the satellite locations and ground node location in place
+        _deltaLocations = np.subtract(_targetLocations[_start:_stop], _viewerLocation, out = _targetLocations[_start:_stop])
+        _deltaLocationNorms = np.linalg.norm(_deltaLocations, axis=1)
+        
+        # calculate the elevation angles. The projections are computed in double precision. The output can be narrower, e.g. float32
+        _projections = _deltaLocations @ _viewerLocation
+        _deltaLocationNorms *= _viewerLocationNorm
+        _projections /= _deltaLocationNorms
+        np.arcsin(_projections, out = _out[_start:_stop])
+    
+    _out *= RAD2DEG
+    return _out
 
 def init_ModelHelperFoV(
                     _ownernodeins: INode, 
@@ -9,7 +9,9 @@ Created on June 23, 2023
     This model will take an image if there is power available and the satellite is in sun. 
     An image will take a certain amount of time to take and will consume a certain amount of power.
 """
+from collections import deque
 from math import ceil
+from types import MethodType
 
 import numpy as np
 
@@ -102,19 +104,9 @@ class ModelImagingLogicBased(IModel):
         @return
             Returns True if the image is possible, False otherwise
         """
-        #We need to add all the images from the last time step to the data store
-        #This is because an image shouldn't be available to the node until the time step that is taken finishes
         #Let's check if we are pointing towards the earth. If the ADACS is on, that means we are also in sun
-        _adacsOn = self.__adacsModel.call_APIs("is_On")
-        if not _adacsOn:
-            return False
-        
-        #Let's check if we have enough energy to take an image
-        _hasEnergy = self.__powerModel.call_APIs("has_Energy", _tag="IMAGING")
-        if not _hasEnergy:
-            return False
-        
-        return _hasEnergy and _adacsOn
+        #Let's check if we have enough energy to take an image only then
+        return bool(self.__adacsModel.call_APIs("is_On")) and bool(self.__powerModel.call_APIs("has_Energy", _tag="IMAGING"))
     
     def __take_Image(self, **_kwargs):
         """
@@ -159,13 +151,12 @@ class ModelImagingLogicBased(IModel):
         @return
             The API return
         '''
-        _ret = None
-
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, **_kwargs)
-        except Exception as e:
-            print(f"[ModelImagingLogicBased]: An unhandled API request has been received by {self.__ownernode.nodeID}", e)
-        return _ret
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
+        
+        return _handler(**_kwargs)
     
     def create_Image(self):
         '''
@@ -180,7 +171,23 @@ class ModelImagingLogicBased(IModel):
         _image = Image(_time, _id, _size)
         return _image
     
+    def __resolve_Models(self):
+        '''
+        @desc
+            Looks up the models of the owner node that this model interacts with. It is done only once on the first Execute
+        '''
+        self.__powerModel = self.__ownernode.has_ModelWithTag(EModelTag.POWER)
+        self.__orbitalModel = self.__ownernode.has_ModelWithTag(EModelTag.ORBITAL)
+        self.__adacsModel = self.__ownernode.has_ModelWithTag(EModelTag.ADACS)
+        self.__dataStore = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
+        self.__modelsResolved = True
+    
     def Execute(self):
+        #Let's first get all the models that we need to interact with. 
+        #It is done before the selfCtrl check so that the APIs can use them as well
+        if not self.__modelsResolved:
+            self.__resolve_Models()
+        
         if not self.__selfCtrl:
             return
         
@@ -192,23 +199,16 @@ class ModelImagingLogicBased(IModel):
         #In the second timestep, we will take the rest of the image along with the new images
         #At the start of the second timestep, the 5 images will be inserted into the data store
         
-        #Let's first get all the models that we need to interact with
-        if self.__powerModel is None:
-            self.__powerModel = self.__ownernode.has_ModelWithTag(EModelTag.POWER)
-            self.__orbitalModel = self.__ownernode.has_ModelWithTag(EModelTag.ORBITAL)
-            self.__adacsModel = self.__ownernode.has_ModelWithTag(EModelTag.ADACS)
-            self.__dataStore = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
-        
-        if len(self.__imagesFromLastTimeStep) > 0:
-            for _image in self.__imagesFromLastTimeStep:
-                self.__dataStore.call_APIs("add_Data", _data=_image)
+        if self.__imagesFromLastTimeStep:
+            self.__dataStore.call_APIs("add_Data_Bulk", _dataList=self.__imagesFromLastTimeStep)
             self.__imagesFromLastTimeStep.clear()
         
         _timeAvailable = float(self.__ownernode.deltaTime) #time available in this time step
         _timeCarryOver = 0.0 #Time that was carried over from the previous time step
-        if self.__currentImage is not None and self.__takingImageTill >= self.__ownernode.timestamp:
+        _now = self.__ownernode.timestamp.to_unix() #current time in seconds. The image timing below is plain float arithmetic
+        if self.__currentImage is not None and self.__takingImageTill >= _now:
             #we are currently taking an image
-            _timeCarryOver = Time.difference_in_seconds(self.__takingImageTill, self.__ownernode.timestamp)
+            _timeCarryOver = self.__takingImageTill - _now
             #if the image completes in this timestep, let's add it to the list of images
             if _timeCarryOver < _timeAvailable:
                 #self.__logger.write_Log("Image completed in this time step", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
@@ -225,17 +225,23 @@ class ModelImagingLogicBased(IModel):
                 _numImages = _timeAvailable/self.__imageTime #This is a float. 5.45 in the example above
                 _numInThisTimeStep = int(_numImages) #Let's take only the integer part. We will carry over the rest. 5 in the example above      
                 
+                #The images which can wholly fit in this time step and the partial image carried over to the next time step 
+                #are powered by one energy request. It returns how many images we had the power for.
+                #The images are granted in order, so the partial image only gets energy when all the whole images got it
+                _numRequested = _numInThisTimeStep + 1
+                _numTaken = self.__powerModel.call_APIs("consume_Energy_Batch", _tag="IMAGING", _duration=self.__timeToBurn, _count=_numRequested)
+                if _numTaken < _numRequested:
+                    self.__logger.write_Log(f"We don't have enough power to take {_numRequested - _numTaken} images", ELogType.LOGWARN, self.__ownernode.timestamp)
+                
                 #Add the images which can wholly fit in this time step 
-                for _ in range(_numInThisTimeStep):
-                    _image = self.__take_Image()
-                    self.__imagesFromLastTimeStep.append(_image)
+                self.__imagesFromLastTimeStep.extend(self.create_Image() for _ in range(min(_numTaken, _numInThisTimeStep)))
                 
                 #Let's add the partial image to the next time step
                 _percentOfImageRemaining = 1 - (_numImages - _numInThisTimeStep) #1 - 0.45 = .55 in the example above
                 _timeRemainingOnNextStep = _percentOfImageRemaining * self.__imageTime #0.55 * 11 = 6.05 in the example above
                 
-                self.__currentImage = self.__take_Image()
-                self.__takingImageTill = self.__ownernode.timestamp.copy().add_seconds(self.__ownernode.deltaTime + _timeRemainingOnNextStep) 
+                self.__currentImage = self.create_Image() if _numTaken == _numRequested else None
+                self.__takingImageTill = _now + self.__ownernode.deltaTime + _timeRemainingOnNextStep
        
         
     def __init__(self, 
@@ -265,6 +271,9 @@ class ModelImagingLogicBased(IModel):
         self.__ownernode = _ownernode
         self.__logger = _loggerins
         
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
+        
         self.__imageTime = _imagingTime 
         self.__timeToBurn = _imagingTime #Duration of energy consumption
         
@@ -277,12 +286,14 @@ class ModelImagingLogicBased(IModel):
         
         self.__imageSize = _imageSize
         
-        self.__takingImageTill = self.__ownernode.simStartTime.copy().add_seconds(-1) #time till which the current image is being taken
+        self.__takingImageTill = self.__ownernode.simStartTime.to_unix() - 1 #time (unix seconds) till which the current image is being taken
         self.__currentImage = None
-        self.__imagesFromLastTimeStep = [] #list of images taken in the last time step
+        self.__imagesFromLastTimeStep = deque() #images taken in the last time step. It is handed to the data store every time step
         
+        self.__modelsResolved = False # whether the models below have been looked up. See __resolve_Models
         self.__powerModel = None
         self.__orbitalModel = None
+        self.__adacsModel = None
         self.__dataStore = None
         
         
@@ -12,8 +12,7 @@ Created on: 8 June 2023
         3. The received packet is then stored in the satellite's local storage.
         Both the acknowledgments and packets are sent and received using the ModelAggregatorRadio's frequency.
 '''
-import pickle
-
+from types import MethodType
 
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import INode
@@ -87,6 +86,43 @@ class ModelMACgateway(IModel):
         '''
         return self.__dependencies
     
+    @property
+    def _uplink(self):
+        """
+        @type
+            ModelAggregatorRadio
+        @desc
+            The uplink radio model of the owner node. 
+            It is looked up on the first access and cached thereafter as the models of a node do not change during the simulation.
+        """
+        if self.__uplinkRadio is None:
+            self.__uplinkRadio = self.__ownernode.has_ModelWithName("ModelAggregatorRadio")
+            if self.__uplinkRadio is None:
+                raise Exception("ModelAggregatorRadio model is not found for owner node: " + self.__nodeIDStr)
+            
+            # bind the radio API handlers used on every step so that the calls skip the call_APIs dispatch
+            _handlers = self.__uplinkRadio._apiHandlerDictionary
+            self.__getReceivedPacket = MethodType(_handlers["get_ReceivedPacket"], self.__uplinkRadio)
+            self.__sendPacket = MethodType(_handlers["send_Packet"], self.__uplinkRadio)
+            # the radio ID is stamped on every ack sent and never changes
+            self.__uplinkRadioID = self.__uplinkRadio.radioID
+        return self.__uplinkRadio
+    
+    @property
+    def _dataModel(self):
+        """
+        @type
+            IModel
+        @desc
+            The data store model of the owner node. 
+            It is looked up on the first access and cached thereafter.
+        """
+        if self.__dataModel is None:
+            self.__dataModel = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
+            if self.__dataModel is None:
+                raise Exception("Data storage is not found for owner node: " + self.__nodeIDStr)
+        return self.__dataModel
+    
     def __str__(self) -> str:
         return "".join(["Model name: ", self.iName + ", " , "Model tag: " + self.__modeltag.__str__()])
     
@@ -108,33 +144,13 @@ class ModelMACgateway(IModel):
         @return
             The API return
         '''
-        _ret = None
-        
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, _kwargs)
-        except Exception as e:
-            print(f"[ModelMACgateway]: An unhandled API request has been received by {self.__ownernode.nodeID}:", e)
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__nodeIDStr}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        return _handler(**_kwargs)
             
-    def __get_ReceivedData(self):
-        """
-        @desc
-            This method returns the received data
-        @return
-            List of received data
-        """
-        _loraModel = self.__ownernode.has_ModelWithName("ModelAggregatorRadio")
-        if _loraModel is None:
-            raise Exception("ModelAggregatorRadio is not found for owner node: " + str(self.__ownernode.nodeId))
-        
-        #the received data is a list of the received data
-        _receivedData = [] 
-        while (_data := _loraModel.call_APIs("get_ReceivedPacket")) is not None:
-            _receivedData.append(_data)
-        
-        return _receivedData
-        
     def __send_Ack(self, _ack):
         """
         @desc
@@ -144,34 +160,42 @@ class ModelMACgateway(IModel):
         @return
             True if the data is sent, False otherwise
         """
-        _uplinkRadio = self.__ownernode.has_ModelWithName("ModelAggregatorRadio")
-        if _uplinkRadio is None:
-            raise Exception("ModelAggregatorRadio model is not found for owner node: " + str(self.__ownernode.nodeId))
-        self.__logger.write_Log(f"Sending ACK with ID {_ack.id}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-        return _uplinkRadio.call_APIs("send_Packet", _packet = _ack)
+        if self.__logInfoEnabled:
+            self.__logger.write_Log(f"Sending ACK with ID {_ack.id}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+        return self.__sendPacket(_packet = _ack)
     
     def Execute(self):
-        #let's first receive the data
-        _receivedDatas = self.__get_ReceivedData()
-        if len(_receivedDatas) == 0:
+        #the radio handlers are bound when the uplink radio is resolved
+        _uplinkModel = self._uplink
+        
+        #nothing has been received in most of the steps. Let's return early then
+        _numReceived = _uplinkModel.get_RxQueueSize()
+        if _numReceived == 0:
             return
-        if len(_receivedDatas) > 1:
+        if _numReceived > 1:
             #We only expect one data at a time since we are running at a fine granularity
             raise Exception("More than one data received. This is not expected. Make the granularity finer.")
         
-        _receivedData = _receivedDatas[0]
-        _uplinkModel = self.__ownernode.has_ModelWithName("ModelAggregatorRadio")
+        #let's receive the data
+        _receivedData = self.__getReceivedPacket()
         
-        self.__logger.write_Log(f"Received MACData with ID {_receivedData.id}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)        
+        if self.__logInfoEnabled:
+            self.__logger.write_Log(f"Received MACData with ID {_receivedData.id}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
         #Let's create the acks
-        _currentTime = self.__ownernode.timestamp.copy()
-        _size = 4 #(I'm assuming that the data size is 4 bytes)
-        _ack = MACAck(creationTime=_currentTime,
-                      sourceRadioID=_uplinkModel.radioID,
-                      size=_size,
-                      intendedRadioID=_receivedData.sourceRadioID,
-                      sequenceNumber=_receivedData.sequenceNumber + 1,
-                      receivedMACDataID=_receivedData.id)
+        #the ack is pickled as soon as it is sent. So, it can refer to the node's timestamp instead of a copy
+        #For the same reason, one ack instance is reused for all the acks with a new ID each time
+        _currentTime = self.__ownernode.timestamp
+        _ack = self.__ack
+        if _ack is None:
+            #the size defaults to 4 bytes (I'm assuming that the data size is 4 bytes)
+            _ack = MACAck.new_Fast(_currentTime, self.__uplinkRadioID, _receivedData.sourceRadioID, _receivedData.sequenceNumber + 1, _receivedData.id)
+            self.__ack = _ack
+        else:
+            _ack.creationTime = _currentTime
+            _ack.intendedRadioID = _receivedData.sourceRadioID
+            _ack.sequenceNumber = _receivedData.sequenceNumber + 1
+            _ack.receivedMACDataID = _receivedData.id
+            _ack.renew_ID()
         
         #Let's send the ack.
         _success = self.__send_Ack(_ack)
@@ -181,10 +205,7 @@ class ModelMACgateway(IModel):
             self.__logger.write_Log(f"Could not send ack for MACData with ID {_receivedData.id}", ELogType.LOGWARN, self.__ownernode.timestamp, self.iName)
             
         #Now, let's send the data to the satellite's data store
-        _dataModel = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
-        if _dataModel is None:
-            raise Exception("Data storage is not found for owner node: " + str(self.__ownernode.nodeId))
-        _dataModel.call_APIs("add_Data", _data = pickle.loads(_receivedData.dataPayloadString))
+        self._dataModel.call_APIs("add_Data", _data = _receivedData.dataPayload)
         
     def __init__(
             self, 
@@ -203,6 +224,21 @@ class ModelMACgateway(IModel):
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        self.__nodeIDStr = str(_ownernodeins.nodeID) #the node ID does not change. So, its string used in the messages is built once
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
+        
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
+        
+        # the dependent models are resolved lazily on the first use as the owner node may not be fully set up yet
+        self.__uplinkRadio = None
+        self.__uplinkRadioID = None
+        self.__getReceivedPacket = None
+        self.__sendPacket = None
+        
+        self.__ack = None #ack instance reused for every ack sent. Created on the first ack
+        self.__dataModel = None
         
 def init_ModelMACgateway(
     _ownernodeins: INode, 
@@ -12,8 +12,7 @@ Created on: 8 June 2023
     3. The satellite responds by transmitting up to "X" packets to the ground station.
     4. The ground station confirms the number of packets received and stores the received packets in its data store.
 '''
-import pickle
-
+from types import MethodType
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import ENodeType, INode
 from src.simlogging.ilogger import ELogType, ILogger
@@ -23,8 +22,6 @@ from src.models.network.macdata.maccontrol import MACControl
 from src.models.network.macdata.macdata import MACData
 from src.models.network.macdata.macbulkack import MACBulkAck
 
-from src.utils import Time
-
 class ModelMACgs(IModel):
     
     __modeltag = EModelTag.MAC
@@ -93,6 +90,44 @@ class ModelMACgs(IModel):
         '''
         return self.__dependencies
     
+    @property
+    def _lora(self):
+        """
+        @type
+            ModelLoraRadio
+        @desc
+            The LoRa radio model of the owner node. 
+            It is looked up on the first access and cached thereafter as the models of a node do not change during the simulation.
+        """
+        if self.__loraModel is None:
+            self.__loraModel = self.__ownernode.has_ModelWithTag(EModelTag.BASICLORARADIO)
+            if self.__loraModel is None:
+                raise Exception("Basic LoRa Radio model is not found for owner node: " + self.__nodeIDStr)
+            
+            # bind the radio API handlers used on every step so that the calls skip the call_APIs dispatch
+            _handlers = self.__loraModel._apiHandlerDictionary
+            self.__getAllReceivedPackets = MethodType(_handlers["get_AllReceivedPackets"], self.__loraModel)
+            self.__sendPacket = MethodType(_handlers["send_Packet"], self.__loraModel)
+            self.__setFrequency = MethodType(_handlers["set_Frequency"], self.__loraModel)
+            # the radio ID is stamped on every packet sent and never changes
+            self.__loraRadioID = self.__loraModel.radioID
+        return self.__loraModel
+    
+    @property
+    def _dataStore(self):
+        """
+        @type
+            IModel
+        @desc
+            The data store model of the owner node. 
+            It is looked up on the first access and cached thereafter.
+        """
+        if self.__dataStoreModel is None:
+            self.__dataStoreModel = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
+            if self.__dataStoreModel is None:
+                raise Exception("Data store model is not found for owner node: " + self.__nodeIDStr)
+        return self.__dataStoreModel
+    
     def __str__(self) -> str:
         return "".join(["Model name: ", self.iName + ", " , "Model tag: " + self.__modeltag.__str__()])
     
@@ -114,14 +149,12 @@ class ModelMACgs(IModel):
         @return
             The API return
         '''
-        _ret = None
-        
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, _kwargs)
-        except Exception as e:
-            print(f"[ModelMACgs]: An unhandled API request has been received by {self.__ownernode.nodeID}:", e)
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__nodeIDStr}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        return _handler(**_kwargs)
             
     def __get_ReceivedData(self, _loraModel):
         """
@@ -131,26 +164,43 @@ class ModelMACgs(IModel):
             List of received data
         """
         #the received data is a list of the received data. This can be beacons or acks
-        _receivedData = [] 
-        while (_data := _loraModel.call_APIs("get_ReceivedPacket")) is not None:
-            _receivedData.append(_data)
-        
-        return _receivedData
+        return self.__getAllReceivedPackets()
     
-    def __get_BeaconIDS(self, _receivedData):
+    def __sort_ReceivedData(self, _receivedData):
         """
         @desc
-            This method returns if a beacon is received
+            This method sorts the received data by their type in a single pass
         @param[in] _receivedData
-            List of received data. This should be the output of __get_ReceivedData and should contain either acks or beacons
+            List of received data. This should be the output of __get_ReceivedData
         @return
-            List of the IDs of the satellites that sent the beacons
+            Tuple of the received beacons, MACData and control packets (in this order)
         """
-        _beaconIDS = []
+        if not _receivedData:
+            return (), (), ()
+        
+        _beacons = []
+        _datas = []
+        _controls = []
+        #the MAC units are not subclassed further. So, the exact type is enough to sort them
+        _sorter = {MACBeacon: _beacons.append, 
+                   MACData: _datas.append, 
+                   MACControl: _controls.append}
         for _data in _receivedData:
-            if isinstance(_data, MACBeacon):
-                _beaconIDS.append(_data.sourceRadioID)
-        return _beaconIDS
+            _append = _sorter.get(type(_data))
+            if _append is not None:
+                _append(_data)
+        return _beacons, _datas, _controls
+    
+    def __tune_Radio(self, _frequency):
+        """
+        @desc
+            This method switches the radio to the given frequency unless it is already tuned to it by this model
+        @param[in] _frequency
+            Frequency (Hz) to switch to
+        """
+        if _frequency != self.__currentFrequency:
+            self.__setFrequency(_frequency = _frequency)
+            self.__currentFrequency = _frequency
     
     def __send_ControlPacket(self, _loraModel, _satelliteID, _numWantedPackets):
         """
@@ -165,22 +215,18 @@ class ModelMACgs(IModel):
         @return
             List of the IDs of the satellites that sent the beacons
         """
-        _time = self.__ownernode.timestamp.copy()
-        _size = 8 #(bytes 4 bytes for satellite ID, 4 bytes for number of packets) - change this to the actual size of the payload
-        _controlPacket = MACControl(creationTime=_time,
-                                    sourceRadioID=_loraModel.radioID,
-                                    size=_size,
-                                    intendedRadioID=_satelliteID,
-                                    sequenceNumber=self.__sequenceNumber,
-                                    numPacketsToSend=_numWantedPackets
-                                    )
+        #the packet is pickled as soon as it is sent. So, it can refer to the node's timestamp instead of a copy
+        _time = self.__ownernode.timestamp
+        #the size defaults to 8 bytes (4 bytes for satellite ID, 4 bytes for number of packets) - change this to the actual size of the payload
+        _controlPacket = MACControl.new_Fast(_time, self.__loraRadioID, _satelliteID, self.__sequenceNumber, _numWantedPackets)
         self.__sequenceNumber += 1
                    
-        self.__logger.write_Log("Sending control packet asking for " + str(_controlPacket.numPacketsToSend), ELogType.LOGINFO, _time, self.iName)
+        if self.__logInfoEnabled:
+            self.__logger.write_Log(f"Sending control packet asking for {_controlPacket.numPacketsToSend}", ELogType.LOGINFO, _time, self.iName)
         
-        _loraModel.call_APIs("send_Packet", _packet = _controlPacket)  
+        self.__sendPacket(_packet = _controlPacket)  
         
-    def __send_BulkAck(self, _loraModel, _satelliteID, _macUnitsReceived: 'List[int]'):
+    def __send_BulkAck(self, _loraModel, _satelliteID, _macUnitsReceived: 'set[int]'):
         """
         @desc
             This method sends an ack to the satellite with the given ID
@@ -189,22 +235,147 @@ class ModelMACgs(IModel):
         @param[in] _satelliteID
             The ID of the satellite to send the ack to
         @param[in] _macUnitsReceived
-            The list of the ids of the MACData units that the satellite has received
+            The set of the ids of the MACData units that the ground station has received. 
+            It is passed as is since the packet is pickled (copied) as soon as it is sent
         """
-        _time = self.__ownernode.timestamp.copy()
-        _size = 8 #(bytes 4 bytes for satellite ID, 4 bytes for data ID) - change this to the actual size of the payload
-        _ack = MACBulkAck(creationTime=_time,
-                          sourceRadioID=_loraModel.radioID,
-                          size=_size,
-                          intendedRadioID=_satelliteID,
-                          sequenceNumber=self.__sequenceNumber,
-                          receivedMACDataIDs=_macUnitsReceived)
+        #the packet is pickled as soon as it is sent. So, it can refer to the node's timestamp instead of a copy
+        _time = self.__ownernode.timestamp
+        #the size defaults to 8 bytes (4 bytes for satellite ID, 4 bytes for data ID) - change this to the actual size of the payload
+        _ack = MACBulkAck.new_Fast(_time, self.__loraRadioID, _satelliteID, self.__sequenceNumber, _macUnitsReceived)
         self.__sequenceNumber += 1
         
-        self.__logger.write_Log(f"Sending bulk ack for packets: {_macUnitsReceived}", ELogType.LOGINFO, _time, self.iName)
+        #the flush thresholds of the bulk ack count from here
+        self.__numPacketsSinceAck = 0
+        self.__lastAckTime = _time.to_unix()
+        
+        if self.__logInfoEnabled:
+            self.__logger.write_Log(f"Sending bulk ack for packets: {_macUnitsReceived}", ELogType.LOGINFO, _time, self.iName)
+        
+        self.__sendPacket(_packet = _ack)
+        
+    def __handle_WaitingForBeacon(self, _loraModel, _beacons, _datas, _controls):
+        """
+        @desc
+            State 1: We are waiting for a beacon from any satellite
+        @param[in] _loraModel
+            The lora model instance
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _datas
+            MACData units received in this time step
+        @param[in] _controls
+            Control packets received in this time step
+        """
+        #If the ground station is in state 1, it should be listening on the beacon frequency
+        self.__tune_Radio(self.__beaconFrequency) #This should already be set. The radio is only retuned if it is not
+        
+        #Let's check if we have received a beacon from any satellite
+        if _beacons:
+            #We have received a beacon. Proceed to state 2
+            self.__listeningRadioID = _beacons[0].sourceRadioID
+            if self.__logInfoEnabled:
+                self.__logger.write_Log(f"Received beacon from radio {self.__listeningRadioID}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            self.__currentState = 2
+        
+        #Otherwise, we have not received a beacon. Let's wait for the next time step
+    
+    def __handle_SendingControl(self, _loraModel, _beacons, _datas, _controls):
+        """
+        @desc
+            State 2: We have received a beacon from the satellite. Let's send a control packet
+        @param[in] _loraModel
+            The lora model instance
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _datas
+            MACData units received in this time step
+        @param[in] _controls
+            Control packets received in this time step
+        """
+        self.__tune_Radio(self.__downlinkFrequency)
+        
+        self.__send_ControlPacket(_loraModel, self.__listeningRadioID, self.__numPackets)
+        
+        #We need to reset the received packet IDs to keep track of the packets that we have received
+        self.__receivedPacketIDs = set()
+        self.__currentState = 3
+        self.__lastTimeReceivedPacket = self.__ownernode.timestamp.to_unix()
+        self.__numPacketsSinceAck = 0
+        self.__lastAckTime = self.__lastTimeReceivedPacket
+    
+    def __handle_ReceivingData(self, _loraModel, _beacons, _datas, _controls):
+        """
+        @desc
+            State 3: We have received n >= 0 packets
+        @param[in] _loraModel
+            The lora model instance
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _datas
+            MACData units received in this time step
+        @param[in] _controls
+            Control packets received in this time step
+        """
+        _now = self.__ownernode.timestamp.to_unix()
+        
+        #If we have received some packets, let's process them
+        if _datas:    
+            #let's get the data store so that we can store the data
+            #The attributes used for every packet are bound to locals once for the whole batch
+            _storeData = self._dataStore.call_APIs
+            _markReceived = self.__receivedPacketIDs.add
+            _logInfoEnabled = self.__logInfoEnabled
+            if _logInfoEnabled:
+                _log = self.__logger.write_Log
+                _info = ELogType.LOGINFO
+                _timestamp = self.__ownernode.timestamp
+                _iName = self.iName
+            
+            for _data in _datas:
+                _payload = _data.dataPayload
+                _id = _data.id
+                
+                if _logInfoEnabled:
+                    _log(f"Received MACData packet {_id} with data id: {_payload.id}", _info, _timestamp, _iName)
+                
+                _storeData("add_Data", _data=_payload)
+                
+                #Add the packet ID to the list of received packet IDs
+                if _logInfoEnabled:
+                    _log(f"Received MACData packet {_id}", _info, _timestamp, _iName)
+                _markReceived(_id)
+            
+            self.__numPacketsSinceAck += len(_datas)
+            self.__lastTimeReceivedPacket = _now
+
+        #let's check if we have received an end of sequence control packet
+        _satsControlPacket = [x for x in _controls if x.sourceRadioID == self.__listeningRadioID]
+
+        #If we have not received all the packets, let's check if we have received a control packet from the satellite. 
+        #If we have, let's check the number of packets that the satellite wants to send us.
+        if len(_satsControlPacket) > 0:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log(f"Received control packet from {self.__listeningRadioID} :{_satsControlPacket}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            _satsControlPacket = _satsControlPacket[0]
+            
+            self.__send_BulkAck(_loraModel, self.__listeningRadioID, self.__receivedPacketIDs)
+            self.__lastTimeReceivedPacket = _now
         
-        _loraModel.call_APIs("send_Packet", _packet = _ack)
+        #Without a control packet, let's still ack the received packets if enough of them have piled up or the oldest unacked one has waited too long
+        elif self.__numPacketsSinceAck > 0 and \
+            ((self.__ackCountThreshold > 0 and self.__numPacketsSinceAck >= self.__ackCountThreshold) or 
+             (self.__ackUsecThreshold > 0 and (_now - self.__lastAckTime) * 1e6 > self.__ackUsecThreshold)):
+            self.__send_BulkAck(_loraModel, self.__listeningRadioID, self.__receivedPacketIDs)
+                
+        #Let's check if we have not received any packets for a while. If we have, let's go to back to state 1
+        elif _now - self.__lastTimeReceivedPacket > self.__timeout:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log(f"Timed out waiting for packets from radio {self.__listeningRadioID}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            self.__tune_Radio(self.__beaconFrequency)
+            self.__currentState = 1
         
+        #If we are here, we're still just listening for packets. Let's keep doing that
+    
     def Execute(self):      
         #The ground station might be in the vicinity of multiple satellites.
         #It should only send a control packet to one satellite at a time. 
@@ -218,81 +389,14 @@ class ModelMACgs(IModel):
         #       If we receive any MACData from any satellite, let's keep it in the data store, but don't change what we are doing
         #       Ignore beacons from other satellites (we don't want another satellite to also send us packets and cause collisions. We shouldn't get them anyway)
         
-        _loraModel = self.__ownernode.has_ModelWithTag(EModelTag.BASICLORARADIO)
-        if _loraModel is None:
-            raise Exception("Basic LoRa Radio model is not found for owner node: " + str(self.__ownernode.nodeId))
+        _loraModel = self._lora
         
         #let's get all of the data from the radio model
         _receivedData = self.__get_ReceivedData(_loraModel)
+        _beacons, _datas, _controls = self.__sort_ReceivedData(_receivedData)
        
-        #State 1: We are waiting for a beacon from any satellite
-        if self.__currentState == 1: 
-            #If the ground station is in state 1, it should be listening on the beacon frequency
-            _loraModel.call_APIs("set_Frequency", _frequency = self.__beaconFrequency) #This should already be set, but let's set it again just in case
-            
-            _satRadioIDs = self.__get_BeaconIDS(_receivedData)
-            #Let's check if we have received a beacon from any satellite
-            if len(_satRadioIDs) > 0:
-                #We have received a beacon. Proceed to state 2
-                self.__listeningRadioID = _satRadioIDs[0]
-                self.__logger.write_Log("Received beacon from radio " + str(self.__listeningRadioID), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                self.__currentState = 2
-            else:
-                #We have not received a beacon. Let's wait for the next time step
-                return
-        
-        #State 2: We have received a beacon from the satellite. Let's send a control packet
-        elif self.__currentState == 2:
-            _loraModel.call_APIs("set_Frequency", _frequency = self.__downlinkFrequency)
-            
-            self.__send_ControlPacket(_loraModel, self.__listeningRadioID, self.__numPackets)
-            
-            #We need to reset the received packet IDs to keep track of the packets that we have received
-            self.__receivedPacketIDs = set()
-            self.__currentState = 3
-            self.__lastTimeReceivedPacket = self.__ownernode.timestamp.copy()
-         
-        #State 3: We have received n >= 0 packets
-        elif self.__currentState == 3: 
-            #If we have received some packets, let's process them
-            if len(_receivedData) > 0:    
-                #let's get the data store so that we can store the data
-                _dataStore = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
-                if _dataStore is None:
-                    raise Exception("Data store model is not found for owner node: " + str(self.__ownernode.nodeID))
-                
-                for _data in _receivedData:
-                    if isinstance(_data, MACData):
-                        _payload = pickle.loads(_data.dataPayloadString)
-                        
-                        self.__logger.write_Log("Received MACData packet " + str(_data.id) + " with data id: " + str(_payload.id), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                        
-                        _dataStore.call_APIs("add_Data", _data=_payload)
-                        
-                        #Add the packet ID to the list of received packet IDs
-                        self.__logger.write_Log("Received MACData packet " + str(_data.id), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                        self.__receivedPacketIDs.add(_data.id)
-                        self.__lastTimeReceivedPacket = self.__ownernode.timestamp.copy()
-    
-            #let's check if we have received an end of sequence control packet
-            _satsControlPacket = [x for x in _receivedData if isinstance(x, MACControl) and x.sourceRadioID == self.__listeningRadioID]
-
-            #If we have not received all the packets, let's check if we have received a control packet from the satellite. 
-            #If we have, let's check the number of packets that the satellite wants to send us.
-            if len(_satsControlPacket) > 0:
-                self.__logger.write_Log("Received control packet from " + str(self.__listeningRadioID) + " :" + str(_satsControlPacket), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                _satsControlPacket = _satsControlPacket[0]
-                
-                self.__send_BulkAck(_loraModel, self.__listeningRadioID, list(self.__receivedPacketIDs))
-                self.__lastTimeReceivedPacket = self.__ownernode.timestamp.copy()
-                    
-            #Let's check if we have not received any packets for a while. If we have, let's go to back to state 1
-            elif Time.difference_in_seconds(self.__ownernode.timestamp, self.__lastTimeReceivedPacket) > self.__timeout:
-                self.__logger.write_Log("Timed out waiting for packets from radio " + str(self.__listeningRadioID), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                _loraModel.call_APIs("set_Frequency", _frequency = self.__beaconFrequency)
-                self.__currentState = 1
-            
-            #If we are here, we're still just listening for packets. Let's keep doing that
+        #let's run the handler of the current state
+        self.__stateHandlers[self.__currentState](_loraModel, _beacons, _datas, _controls)
             
     def __init__(
             self, 
@@ -302,6 +406,8 @@ class ModelMACgs(IModel):
             _timeout: int,
             _beaconFrequency: int,
             _downlinkFrequency: int,
+            _ackCountThreshold: int = 0,
+            _ackUsecThreshold: int = 0
             ) -> None:
         '''
         @desc
@@ -319,26 +425,57 @@ class ModelMACgs(IModel):
             The frequency at which the satellite sends beacons
         @param[in]  _downlinkFrequency
             The frequency at which the satellite sends downlink packets
+        @param[in]  _ackCountThreshold
+            Number of received packets after which a bulk ack is sent without waiting for the control packet of the satellite.
+            0 disables this count based flush
+        @param[in]  _ackUsecThreshold
+            Time (microseconds) after the last bulk ack after which the received packets are acked without waiting for the control packet of the satellite.
+            0 disables this time based flush
         '''
         assert _ownernodeins is not None
         assert _loggerins is not None
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        self.__nodeIDStr = str(_ownernodeins.nodeID) #the node ID does not change. So, its string used in the messages is built once
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
+        
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
         
         self.__currentState = 1 #See execute() for the meaning of each state
+        #Handlers of the states indexed by the state number
+        self.__stateHandlers = (None, 
+                                self.__handle_WaitingForBeacon, 
+                                self.__handle_SendingControl, 
+                                self.__handle_ReceivingData)
         
         self.__numPackets = _numPackets #Number of packets to ask the satellite to send
         self.__timeout = _timeout #How long to wait to not receive any packets from the satellite before moving on.
         
         self.__beaconFrequency = _beaconFrequency
         self.__downlinkFrequency = _downlinkFrequency
+        self.__currentFrequency = None #Frequency that this model has last tuned the radio to. None until the first tuning
         
         self.__receivedPacketIDs = set() #Set of received packet IDs
         self.__listeningRadioID = -1 #ID of the satellite's radio that we are listening to 
-        self.__lastTimeReceivedPacket = -1 #Time when we last received a packet from the satellite that we are communicating with
+        self.__lastTimeReceivedPacket = -1 #Time (unix seconds) when we last received a packet from the satellite that we are communicating with
         self.__sequenceNumber = 0 #Sequence number of the control packet that we are sending to the satellite
         
+        self.__ackCountThreshold = _ackCountThreshold #Number of received packets which triggers a bulk ack. 0 disables it
+        self.__ackUsecThreshold = _ackUsecThreshold #Time (microseconds) since the last bulk ack which triggers a bulk ack. 0 disables it
+        self.__numPacketsSinceAck = 0 #Number of the packets received since the last bulk ack
+        self.__lastAckTime = -1 #Time (unix seconds) when we last sent a bulk ack (or the control packet)
+        
+        # the dependent models are resolved lazily on the first use as the owner node may not be fully set up yet
+        self.__loraModel = None
+        self.__loraRadioID = None
+        self.__getAllReceivedPackets = None
+        self.__sendPacket = None
+        self.__setFrequency = None
+        self.__dataStoreModel = None
+        
 def init_ModelMACgs(
     _ownernodeins: INode, 
     _loggerins: ILogger, 
@@ -360,6 +497,12 @@ def init_ModelMACgs(
             What frequency to listen for beacons from the satellite
         @key downlink_frequency
             What frequency to listen for data packets from the satellite
+        @key ack_count_threshold
+            (Optional) Number of received packets after which a bulk ack is sent without waiting for the control packet of the satellite. 
+            Default is 0, i.e., disabled
+        @key ack_usec_threshold
+            (Optional) Time (microseconds) after the last bulk ack after which the received packets are acked without waiting for the control packet of the satellite. 
+            Default is 0, i.e., disabled
     @return
         Instance of the model class
     '''
@@ -368,11 +511,21 @@ def init_ModelMACgs(
     assert _loggerins is not None
     
     if "num_packets" not in _modelArgs or "timeout" not in _modelArgs or "beacon_frequency" not in _modelArgs or "downlink_frequency" not in _modelArgs:
-        raise Exception("num_packets, timeout, beacon_frequency, or downlink_frequency is not provided for ModelMACgs for node " + _ownernodeins.nodeID)
+        raise Exception("num_packets, timeout, beacon_frequency, or downlink_frequency is not provided for ModelMACgs for node " + str(_ownernodeins.nodeID))
+    
+    _ackCountThreshold = 0
+    if "ack_count_threshold" in _modelArgs:
+        _ackCountThreshold = _modelArgs.ack_count_threshold
+    
+    _ackUsecThreshold = 0
+    if "ack_usec_threshold" in _modelArgs:
+        _ackUsecThreshold = _modelArgs.ack_usec_threshold
 
     return ModelMACgs(_ownernodeins, 
                           _loggerins,
                           _modelArgs.num_packets,
                           _modelArgs.timeout,
                           _modelArgs.beacon_frequency,
-                          _modelArgs.downlink_frequency)
\ No newline at end of file
+                          _modelArgs.downlink_frequency,
+                          _ackCountThreshold,
+                          _ackUsecThreshold)
\ No newline at end of file
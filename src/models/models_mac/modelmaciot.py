@@ -12,12 +12,14 @@ Created on: 8 June 2023
     3. If the beacon is the latest, the model attempts data transmission and waits for an acknowledgment (ACK). Both packet transmission and ACK reception occur through the modelradio.
     4. The model persists in retransmitting during subsequent beacon cycles until it successfully receives the ACK.
 '''
-import pickle
 import random
+from datetime import datetime, timedelta, timezone
+from types import MethodType
 
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import INode
 from src.simlogging.ilogger import ELogType, ILogger
+from src.utils import Time
 
 from src.models.network.macdata.macbeacon import MACBeacon
 from src.models.network.macdata.macack import MACAck
@@ -30,6 +32,16 @@ class ModelMACiot(IModel):
     __dependencies = [['ModelGenericRadio', 'ModelLoraRadio', 'ModelDownlinkRadio', 'ModelAggregatorRadio'], 
                       ['ModelDataGenerator']]
     
+    __sleepForever = datetime.max.replace(tzinfo=timezone.utc) #Sleep time of a state that waits only on received packets
+    
+    # Every IoT node carries its own MAC instance. The state is kept in slots so that these instances do not need a dictionary each
+    __slots__ = ('__ownernode', '__logger', '__logInfoEnabled', 
+                 '__retransmitInterval', '__backoffInterval', '__randrange', '__beaconFrequency', '__uplinkFrequency', 
+                 '__transmitTime', '__ackDeadline', '__sleepUntil', '__currentData', '__sequenceNumber', 
+                 '__currentState', '__stateHandlers', 
+                 '__loraModel', '__loraRadioID', '__getAllReceivedPackets', '__isRxQueueEmpty', '__sendPacket', '__setFrequency', 
+                 '__currentFrequency', '__dataGenerator')
+    
     @property
     def iName(self) -> str:
         """
@@ -128,43 +140,77 @@ class ModelMACiot(IModel):
         @return
             List of received data
         """
-        _receivedData = [] 
-        while (_data := self.__loraModel.call_APIs("get_ReceivedPacket")) is not None:
-            _receivedData.append(_data)
+        #the whole buffer is drained through one API call instead of one call per packet
+        return self.__getAllReceivedPackets()
+    
+    def __sort_ReceivedData(self, _receivedData):
+        """
+        @desc
+            This method sorts the received data by their type in a single pass
+        @param[in] _receivedData
+            List of received data. This should be the output of __get_ReceivedData and should contain either acks or beacons
+        @return
+            Tuple of the received acks and beacons (in this order)
+        """
+        if not _receivedData:
+            return (), ()
         
-        return _receivedData
+        _acks = []
+        _beacons = []
+        #the MAC units are not subclassed further. So, the exact type is enough to sort them
+        _sorter = {MACAck: _acks.append, 
+                   MACBeacon: _beacons.append}
+        for _data in _receivedData:
+            _append = _sorter.get(type(_data))
+            if _append is not None:
+                _append(_data)
+        return _acks, _beacons
     
-    def __check_AcksReceived(self, _desiredData, _receivedData):
+    def __check_AcksReceived(self, _desiredData, _acks):
         """
         @desc
-            This method returns the received data
+            This method returns if the ack of the desired data is received
         @param[in] _desiredData
             The MACData unit that we are waiting for an ack
-        @param[in] _receivedData
-            List of received data. This should be the output of __get_ReceivedData and should contain either acks or beacons
+        @param[in] _acks
+            List of received acks. This should be the output of __sort_ReceivedData
         @return
             True if the ack is received, False otherwise
         """
-        for _data in _receivedData:
-            if isinstance(_data, MACAck) and _data.receivedMACDataID == _desiredData.id:
+        _desiredID = _desiredData.id
+        for _ack in _acks:
+            if _ack.receivedMACDataID == _desiredID:
                 return True
         return False
     
-    def __check_BeaconsReceived(self, _receivedData):
+    def __check_BeaconsReceived(self, _beacons, _receivedData):
         """
         @desc
             This method returns if a beacon is received
+        @param[in] _beacons
+            List of received beacons. This should be the output of __sort_ReceivedData
         @param[in] _receivedData
-            List of received data. This should be the output of __get_ReceivedData and should contain either acks or beacons
+            List of all the received data. It is logged along with the beacons
         @return
             True if a beacon is received, False otherwise
         """
-        for _data in _receivedData:
-            if isinstance(_data, MACBeacon):
-                self.__logger.write_Log(f"Beacons received: " + str(_receivedData), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                return True
+        if _beacons:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log(f"Beacons received: {_receivedData}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            return True
         return False
         
+    def __tune_Radio(self, _frequency):
+        """
+        @desc
+            This method switches the radio to the given frequency unless it is already tuned to it by this model
+        @param[in] _frequency
+            Frequency (Hz) to switch to
+        """
+        if _frequency != self.__currentFrequency:
+            self.__setFrequency(_frequency = _frequency)
+            self.__currentFrequency = _frequency
+    
     def __send_Data(self):
         """
         @desc
@@ -172,115 +218,206 @@ class ModelMACiot(IModel):
         @return
             True if the data is sent, False otherwise
         """
-        return self.__loraModel.call_APIs("send_Packet", _packet = self.__currentData)
+        return self.__sendPacket(_packet = self.__currentData)
+    
+    def __handle_NoData(self, _acks, _beacons, _receivedData):
+        """
+        @desc
+            State 1: We have no data to send
+        @param[in] _acks
+            Acks received in this time step
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _receivedData
+            All the data received in this time step
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #let's see if we can get some
+        _data = self.__dataGenerator.call_APIs("get_Data")
+        if _data is None:
+            #we have no data to send. Let's continue waiting. State remains 1
+            return False
+        
+        #We need to add the MAC header to the data
+        _time = self.__ownernode.timestamp.copy()
+        _size = _data.size + 4 #TODO: change this to the actual size of the payload
+        #the data object is carried as is. The radio pickles the whole MAC unit on transmission
+        _macData = MACData.new_Fast(_time, self.__loraRadioID, -1, self.__sequenceNumber, _data, _size)
+        
+        self.__sequenceNumber += 1
+        
+        self.__currentData = _macData
+        
+        #we have data to send. Proceed to state 2
+        self.__tune_Radio(self.__beaconFrequency)
+        self.__currentState = 2
+        return True
+    
+    def __handle_WaitingForBeacon(self, _acks, _beacons, _receivedData):
+        """
+        @desc
+            State 2: We have data to send and are waiting for a beacon
+        @param[in] _acks
+            Acks received in this time step
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _receivedData
+            All the data received in this time step
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #The radio is tuned to the beacon frequency whenever we enter this state. Retuning only happens if it changed
+        self.__tune_Radio(self.__beaconFrequency)
+        if not self.__check_BeaconsReceived(_beacons, _receivedData):
+            #Let's continue waiting for a beacon. State remains 2
+            #Only a received packet can bring the beacon. So, we sleep until one is received
+            self.__sleepUntil = self.__sleepForever
+            return False
+        
+        #We have received a beacon. This is state 3, which is passed through right away: 
+        #set a backoff period before sending data and go on to state 4
+        _timeToBackoff = self.__randrange(self.__backoffInterval + 1)
+        #the deadlines are kept as datetime, which is immutable. So, they are derived from the node's timestamp without copying it
+        self.__transmitTime = self.__ownernode.timestamp.time + timedelta(seconds = _timeToBackoff)
+        if self.__logInfoEnabled:
+            self.__logger.write_Log(f"Backing off till: {Time().from_datetime(self.__transmitTime)}", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+        self.__currentState = 4
+        
+        #we will switch to the ack/send frequency:
+        self.__tune_Radio(self.__uplinkFrequency)
+        return True
+    
+    def __handle_BackingOff(self, _acks, _beacons, _receivedData):
+        """
+        @desc
+            State 4: We are in the backoff period and waiting to send data
+        @param[in] _acks
+            Acks received in this time step
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _receivedData
+            All the data received in this time step
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #Let's check if the backoff period is over
+        if self.__transmitTime <= self.__ownernode.timestamp.time:
+            #we should send the data. Let's go to state 5
+            self.__currentState = 5
+            return True
+        
+        #we should not send the data. Let's try again later. State remains 4
+        #The received packets are dropped in this state anyway. So, we sleep until the backoff is over
+        self.__sleepUntil = self.__transmitTime
+        return False
+    
+    def __handle_SendingData(self, _acks, _beacons, _receivedData):
+        """
+        @desc
+            State 5: We are past the backoff period and sending data
+        @param[in] _acks
+            Acks received in this time step
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _receivedData
+            All the data received in this time step
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #let's send the data
+        _success = self.__send_Data()
+        if _success:
+            #we have sent the data. Let's go to state 6            
+            #the ack deadline is fixed from here on. So, it is computed once instead of on every step of state 6
+            self.__ackDeadline = self.__transmitTime + timedelta(seconds = self.__retransmitInterval)
+            self.__currentState = 6
+        else:
+            #For some reason, we could not send the data. This is likely that the sat is now out of range. 
+            #Go back to waiting for a beacon. State goes back to 2
+            self.__currentState = 2
+        
+        #Either way, the next state runs in the next timestep. State 6 deals with the acks received from then on
+        return False
+    
+    def __handle_WaitingForAck(self, _acks, _beacons, _receivedData):
+        """
+        @desc
+            State 6: We have sent data and waiting for an ack
+        @param[in] _acks
+            Acks received in this time step
+        @param[in] _beacons
+            Beacons received in this time step
+        @param[in] _receivedData
+            All the data received in this time step
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #if we have received the desired ack, we can go back to state 1. 
+        if self.__check_AcksReceived(self.__currentData, _acks):
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Ack received", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            self.__currentState = 1
+            return True
+        
+        # if passed the timeout, we need to go back to state 2 and retransmit
+        if self.__ackDeadline <= self.__ownernode.timestamp.time:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Timeout on ack. Retransmitting", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            self.__currentState = 2
+            return True
+        
+        #we are still waiting for the ack. Let's continue waiting. State remains 6
+        #We sleep until either a packet is received or the ack deadline passes
+        self.__sleepUntil = self.__ackDeadline
+        return False
     
     def Execute(self):       
         #Let's get the radio model and store it so we don't have to get it every time
         if self.__loraModel is None:
             self.__loraModel = self.__ownernode.has_ModelWithTag(EModelTag.BASICLORARADIO)
+            if self.__loraModel is None:
+                raise Exception("Basic LoRa Radio model is not found for owner node: " + str(self.__ownernode.nodeID))
+            
+            # bind the radio API handlers used on every step so that the calls skip the call_APIs dispatch
+            _handlers = self.__loraModel._apiHandlerDictionary
+            self.__getAllReceivedPackets = MethodType(_handlers["get_AllReceivedPackets"], self.__loraModel)
+            self.__isRxQueueEmpty = MethodType(_handlers["is_RxQueueEmpty"], self.__loraModel)
+            self.__sendPacket = MethodType(_handlers["send_Packet"], self.__loraModel)
+            self.__setFrequency = MethodType(_handlers["set_Frequency"], self.__loraModel)
+            # the radio ID is stamped on every packet sent and never changes
+            self.__loraRadioID = self.__loraModel.radioID
+        
+        #Same for the data generator model. It is otherwise looked up on every idle step
+        if self.__dataGenerator is None:
+            self.__dataGenerator = self.__ownernode.has_ModelWithTag(EModelTag.DATAGENERATOR)
+            if self.__dataGenerator is None:
+                raise Exception("Data generator model is not found for owner node: " + str(self.__ownernode.nodeID))
             
         #We have a few possible states:
         # 1. We have no data to send
         # 2. We have data to send and are waiting for a beacon
-        # 3. We have received a beacon. Set a backoff period before sending data
+        # 3. We have received a beacon. Set a backoff period before sending data. This is done on the way out of state 2
         # 4. We are in the backoff period and waiting to send data
         # 5. We are past the backoff period and are sending the data
         # 6. We have sent data and waiting for an ack        
+        #A waiting state only changes on a received packet or when its deadline passes. Until then, the step can be skipped
+        #The sleep is only set by the handlers after the radio is initialized above
+        if self.__sleepUntil is not None and \
+            self.__isRxQueueEmpty() and \
+            self.__ownernode.timestamp.time < self.__sleepUntil:
+            return
+        self.__sleepUntil = None
+        
         #Let's first get all the received data. This will be used in multiple states
         #We do it here because multiple states need it. This will empty the received data queue. 
         _receivedData = self.__get_ReceivedData() 
+        _acks, _beacons = self.__sort_ReceivedData(_receivedData)
         
-        #We handle the state 6 first because it deals with the previous timestamp (waiting for ack)
-        if self.__currentState == 6:
-            #if we have received the desired ack, we can go back to state 1. 
-            if self.__check_AcksReceived(self.__currentData, _receivedData):
-                self.__logger.write_Log("Ack received", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                self.__currentState = 1
-            
-            # if passed the timeout, we need to go back to state 2 and retransmit
-            elif self.__transmitTime.copy().add_seconds(self.__retransmitInterval) <= self.__ownernode.timestamp:
-                self.__logger.write_Log("Timeout on ack. Retransmitting", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                self.__currentState = 2
-            
-            else:
-                #we are still waiting for the ack. Let's continue waiting. State remains 6
-                return
-            
-        #State 1: We have no data to send
-        if self.__currentState == 1:
-            #let's see if we can get some
-            _dataGenerator = self.__ownernode.has_ModelWithTag(EModelTag.DATAGENERATOR)
-            if _dataGenerator is None:
-                raise Exception("Data generator model is not found for owner node: " + str(self.__ownernode.nodeId))
-            
-            _data = _dataGenerator.call_APIs("get_Data")
-            if _data is not None:
-                #We need to add the MAC header to the data
-                _time = self.__ownernode.timestamp.copy()
-                _payload = pickle.dumps(_data)
-                _size = _data.size + 4 #TODO: change this to the actual size of the payload
-                _macData = MACData(creationTime=_time,
-                                      sourceRadioID=self.__loraModel.radioID,
-                                      size=_size,
-                                      intendedRadioID=-1, 
-                                      sequenceNumber=self.__sequenceNumber,
-                                      dataPayloadString=_payload)
-                
-                self.__sequenceNumber += 1
-                
-                self.__currentData = _macData
-                
-                #we have data to send. Proceed to state 2
-                self.__loraModel.call_APIs("set_Frequency", _frequency = self.__beaconFrequency)
-                self.__currentState = 2
-            else:
-                #we have no data to send. Let's continue waiting. State remains 1
-                return 
-        
-        #State 2: We have data to send and are waiting for a beacon
-        if self.__currentState == 2:
-            self.__loraModel.call_APIs("set_Frequency", _frequency = self.__beaconFrequency) #Should already be set, but just in case
-            _beaconsReceived = self.__check_BeaconsReceived(_receivedData)
-            if _beaconsReceived:
-                #We have received a beacon. Let's go to state 3
-                self.__currentState = 3
-            else:
-                #Let's continue waiting for a beacon. State remains 2
-                return
-        
-        #State 3: We have received a beacon. Set a backoff period before sending data
-        if self.__currentState == 3:
-            _timeToBackoff = random.randint(0, self.__backoffInterval)
-            self.__transmitTime = self.__ownernode.timestamp.copy().add_seconds(_timeToBackoff)
-            self.__logger.write_Log(f"Backing off till: " + str(self.__transmitTime), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-            self.__currentState = 4
-            
-            #we will switch to the ack/send frequency:
-            self.__loraModel.call_APIs("set_Frequency", _frequency = self.__uplinkFrequency)
-         
-        #State 4: We are in the backoff period and waiting to send data
-        if self.__currentState == 4:
-            #Let's check if the backoff period is over
-            if self.__transmitTime <= self.__ownernode.timestamp:
-                #we should send the data. Let's go to state 5
-                self.__currentState = 5
-            else:
-                #we should not send the data. Let's try again later. State remains 4
-                return
-        
-        #State 5: We are past the backoff period and sending data
-        if self.__currentState == 5:
-            #let's send the data
-            _success = self.__send_Data()
-            if _success:
-                #we have sent the data. Let's go to state 6            
-                self.__currentState = 6
-            else:
-                #For some reason, we could not send the data. This is likely that the sat is now out of range. 
-                #Go back to waiting for a beacon. State goes back to 2
-                self.__currentState = 2
-
-        #State 6 is handled at the beginning of the next timestep
+        #let's run the handler of the current state. A handler returns True if the state it moved to should also run in this timestep
+        _stateHandlers = self.__stateHandlers
+        while _stateHandlers[self.__currentState](_acks, _beacons, _receivedData):
+            pass
         
     def __init__(
             self, 
@@ -311,18 +448,40 @@ class ModelMACiot(IModel):
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
         
         self.__retransmitInterval = _retransmit
         self.__backoffInterval = _backoff
+        #The backoff is drawn from the shared generator of the random module so that random.seed() still governs the runs.
+        #randrange(n + 1) draws the same values as randint(0, n) with one call less
+        self.__randrange = random.randrange
         self.__beaconFrequency = _beaconFrequency
         self.__uplinkFrequency = _uplinkFrequency
         
-        self.__transmitTime: 'Time' = None #The time at which we will send the next data
+        self.__transmitTime: datetime = None #The time at which we will send the next data
+        self.__ackDeadline: datetime = None #The time after which we retransmit the data if its ack is not received
+        self.__sleepUntil: datetime = None #Time until which the steps are skipped while no packet is received. None if not sleeping
         self.__currentData = None #The data that we are sending/waiting to send/waiting for ack
         self.__sequenceNumber = 0 #The sequence number of the data that we are sending/waiting to send/waiting for ack
         
         self.__currentState = 1 #See execute() for the meaning of each state
+        #Handlers of the states indexed by the state number
+        self.__stateHandlers = (None, 
+                                self.__handle_NoData, 
+                                self.__handle_WaitingForBeacon, 
+                                None, #state 3 is passed through within the handler of state 2
+                                self.__handle_BackingOff, 
+                                self.__handle_SendingData, 
+                                self.__handle_WaitingForAck)
         self.__loraModel = None #The model of the LoRa radio that we are using
+        self.__getAllReceivedPackets = None #Bound API handlers of the LoRa radio model. Set along with the model
+        self.__loraRadioID = None
+        self.__isRxQueueEmpty = None
+        self.__sendPacket = None
+        self.__setFrequency = None
+        self.__currentFrequency = None #Frequency that this model has last tuned the radio to. None until the first tuning
+        self.__dataGenerator = None #The data generator model that we get the data to send from
                 
 def init_ModelMACiot(
     _ownernodeins: INode, 
@@ -337,10 +496,10 @@ def init_ModelMACiot(
         Logger instance
     @param[in]  _modelArgs
         It's a converted JSON object containing the model related info. 
-        @key num_packets
-            The number of packets to ask the satellite to send
-        @key timeout
-            How long to wait to not receive any packets from the satellite before moving on.
+        @key backoff_time
+            Backoff time in seconds. After a beacon, the data is sent after a random backoff between 0 and backoff_time
+        @key retransmit_time
+            Retransmission time in seconds. The data is retransmitted if its ack is not received within retransmit_time
         @key beacon_frequency
             What frequency to listen for beacons from the satellite
         @key uplink_frequency
@@ -352,8 +511,8 @@ def init_ModelMACiot(
     assert _ownernodeins is not None
     assert _loggerins is not None
     
-    if "backoff_time" not in _modelArgs or "retransmit_time" not in _modelArgs or "beacon_frequency" not in "uplink_frequency" not in _modelArgs: 
-        raise Exception("backoff_time, retransmit_time, beacon_frequency, timeout or is not provided for ModelMACiot for node " + _ownernodeins.nodeID)
+    if "backoff_time" not in _modelArgs or "retransmit_time" not in _modelArgs or "beacon_frequency" not in _modelArgs or "uplink_frequency" not in _modelArgs: 
+        raise Exception("backoff_time, retransmit_time, beacon_frequency, or uplink_frequency is not provided for ModelMACiot for node " + str(_ownernodeins.nodeID))
 
     return ModelMACiot(_ownernodeins, 
                           _loggerins,
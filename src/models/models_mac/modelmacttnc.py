@@ -18,42 +18,23 @@ from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import ENodeType, INode
 from src.simlogging.ilogger import ELogType, ILogger
 import random
+from collections import deque
+from types import MethodType
 from src.models.network.macdata.macbeacon import MACBeacon
 from src.models.network.macdata.maccontrol import MACControl
 from src.models.network.macdata.macdata import MACData
 from src.models.network.macdata.macbulkack import MACBulkAck
-import pickle
 
 class ModelMACTTnC(IModel):
 
-    __modeltag = EModelTag.MAC
+    #the name, tag, supported nodes and dependencies are the same for all instances. So, they are plain class attributes instead of the properties of IModel
+    iName = 'ModelMACTTnC'
+    modelTag = EModelTag.MAC
     __ownernode: INode
-    __supportednodeclasses = ['SatelliteBasic']
-    __dependencies = [['ModelGenericRadio', 'ModelLoraRadio', 'ModelDownlinkRadio', 'ModelAggregatorRadio'],
-                       ['ModelDataStore']]
+    supportedNodeClasses = ['SatelliteBasic']
+    dependencyModelClasses = [['ModelGenericRadio', 'ModelLoraRadio', 'ModelDownlinkRadio', 'ModelAggregatorRadio'],
+                              ['ModelDataStore']]
     
-    
-    @property
-    def iName(self) -> str:
-        """
-        @type 
-            str
-        @desc
-            A string representing the name of the model class. For example, ModelPower 
-            Note that the name should exactly match to your class name. 
-        """
-        return self.__class__.__name__
-    
-    @property
-    def modelTag(self) -> EModelTag:
-        """
-        @type
-            EModelTag
-        @desc
-            The model tag for the implemented model
-        """
-        return self.__modeltag
-
     @property
     def ownerNode(self):
         """
@@ -67,34 +48,46 @@ class ModelMACTTnC(IModel):
         return self.__ownernode
     
     @property
-    def supportedNodeClasses(self) -> 'list[str]':
-        '''
+    def _downlink(self):
+        """
         @type
-            List of string
+            ModelDownlinkRadio
         @desc
-            A model may not support all the node implementation. 
-            supportedNodeClasses gives the list of names of the node implementation classes that it supports.
-            For example, if a model supports only the SatBasic and SatAdvanced, the list should be ['SatBasic', 'SatAdvanced']
-            If the model supports all the node implementations, just keep the list EMPTY.
-        '''
-        return self.__supportednodeclasses
+            The downlink radio model of the owner node. 
+            It is looked up on the first access and cached thereafter as the models of a node do not change during the simulation.
+        """
+        if self.__downlinkRadio is None:
+            self.__downlinkRadio = self.__ownernode.has_ModelWithName("ModelDownlinkRadio")
+            if self.__downlinkRadio is None:
+                raise Exception("Downlink radio model is not found for owner node: " + str(self.__ownernode.nodeID))
+            
+            # bind the radio API handlers used on every step so that the calls skip the call_APIs dispatch
+            _handlers = self.__downlinkRadio._apiHandlerDictionary
+            self.__getAllReceivedPackets = MethodType(_handlers["get_AllReceivedPackets"], self.__downlinkRadio)
+            self.__isRxQueueEmpty = MethodType(_handlers["is_RxQueueEmpty"], self.__downlinkRadio)
+            self.__sendPacket = MethodType(_handlers["send_Packet"], self.__downlinkRadio)
+            self.__setFrequency = MethodType(_handlers["set_Frequency"], self.__downlinkRadio)
+            # the radio ID is stamped on every packet sent and checked against every packet received. It never changes
+            self.__downlinkRadioID = self.__downlinkRadio.radioID
+        return self.__downlinkRadio
     
     @property
-    def dependencyModelClasses(self) -> 'list[list[str]]':
-        '''
+    def _dataStore(self):
+        """
         @type
-            Nested list of string
+            IModel
         @desc
-            dependencyModelClasses gives the nested list of name of the model implementations that this model has dependency on.
-            For example, if a model has dependency on the ModelPower and ModelOrbitalBasic, the list should be [['ModelPower'], ['ModelOrbitalBasic']].
-            Now, if the model can work with EITHER of the ModelOrbitalBasic OR ModelOrbitalAdvanced, the these two should come under one sublist looking like [['ModelPower'], ['ModelOrbitalBasic', 'ModelOrbitalAdvanced']]. 
-            So each exclusively dependent model should be in a separate sublist and all the models that can work with either of the dependent models should be in the same sublist.
-            If your model does not have any dependency, just keep the list EMPTY. 
-        '''
-        return self.__dependencies
+            The data store model of the owner node. 
+            It is looked up on the first access and cached thereafter.
+        """
+        if self.__dataStoreModel is None:
+            self.__dataStoreModel = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
+            if self.__dataStoreModel is None:
+                raise Exception("Data storage is not found for owner node: " + str(self.__ownernode.nodeID))
+        return self.__dataStoreModel
     
     def __str__(self) -> str:
-        return "".join(["Model name: ", self.iName + ", " , "Model tag: " + self.__modeltag.__str__()])
+        return "".join(["Model name: ", self.iName + ", " , "Model tag: " + self.modelTag.__str__()])
     
     # API dictionary where API name is the key and handler function is the value
     __apiHandlerDictionary = {
@@ -114,180 +107,286 @@ class ModelMACTTnC(IModel):
         @return
             The API return
         '''
-        _ret = None
-        
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, _kwargs)
-        except Exception as e:
-            print(f"[ModelMACTTnC]: An unhandled API request has been received by {self.__ownernode.nodeID}:", e)
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        return _ret
+        return _handler(**_kwargs)
             
-    def __get_ReceivedData(self, _loraModel):
+    def __sort_ReceivedData(self, _receivedData, _myRadioID):
         """
         @desc
-            This method returns all the received data from the LoRa radio model. It will empty the received data buffer of the LoRa radio model.
-        @param[in]
-            _loraModel: LoRa radio model to get the received data from
+            This method picks the control packet and bulk acks addressed to this satellite out of the received data in a single pass.
+            In the off chance that multiple control packets are received, the one with the highest amount of data requested is picked
+        @param[in] _receivedData
+            All the data received in this time step
+        @param[in] _myRadioID
+            ID of the radio that the packets should be addressed to
         @return
-            List of received data
+            Tuple of the picked control packet (None if there is none) and the bulk acks (in this order)
         """
-        _receivedData = [] 
-        while (_data := _loraModel.call_APIs("get_ReceivedPacket")) is not None:
-            _receivedData.append(_data)
-        
-        return _receivedData
+        _controlPacket = None
+        _acks = []
+        #the MAC units are not subclassed further. So, the exact type is enough to sort them
+        for _data in _receivedData:
+            _type = type(_data)
+            if _type is MACControl:
+                if _data.intendedRadioID == _myRadioID and \
+                    (_controlPacket is None or _data.numPacketsToSend > _controlPacket.numPacketsToSend):
+                    _controlPacket = _data
+            elif _type is MACBulkAck and _data.intendedRadioID == _myRadioID:
+                _acks.append(_data)
+        return _controlPacket, _acks
     
-    def __send_Beacon(self, _loraModel):
+    def __send_Beacon(self, _timestamp):
         """
         @desc
             This method creates a beacon and sends it on the beacon frequency. It also sets the next beacon time.
         @param[in]
-            _loraModel: LoRa radio model to send the beacon from
+            _timestamp: Current time of the owner node
         """
         #We send a beacon on the beacon frequency 
-        _loraModel.call_APIs("set_Frequency", _frequency = self.__beaconFrequency)
+        self.__setFrequency(_frequency = self.__beaconFrequency)
         
-        _time = self.__ownernode.timestamp.copy()
-        _size = 8 #TODO: change this to the actual size of the payload
-        _beacon = MACBeacon(creationTime=_time,
-                            sourceRadioID=_loraModel.radioID,
-                            size=_size,
-                            intendedRadioID=-1,
-                            sequenceNumber=0,
-                            numDevicesInView=0)
+        #the beacon is pickled as soon as it is sent. So, one beacon instance is reused for all the beacons with a new ID each time
+        #For the same reason, it can refer to the node's timestamp instead of a copy
+        _beacon = self.__beacon
+        if _beacon is None:
+            _size = 8 #TODO: change this to the actual size of the payload
+            _beacon = MACBeacon(creationTime=_timestamp,
+                                sourceRadioID=self.__downlinkRadioID,
+                                size=_size,
+                                intendedRadioID=-1,
+                                sequenceNumber=0,
+                                numDevicesInView=0)
+            self.__beacon = _beacon
+        else:
+            _beacon.renew_ID()
         
-        _loraModel.call_APIs("send_Packet", _packet = _beacon)
-        self.__nextBeaconTime = self.__ownernode.timestamp.copy().add_seconds(self.__beaconInterval + random.randint(0, self.__beaconBackoff))
+        self.__sendPacket(_packet = _beacon)
+        self.__nextBeaconTime = _timestamp.copy().add_seconds(self.__beaconInterval + self.__randrange(self.__beaconBackoff + 1))
         
         #We listen for controls/acks and send data on the downlink frequency
-        _loraModel.call_APIs("set_Frequency", _frequency = self.__downlinkFrequency)
+        self.__setFrequency(_frequency = self.__downlinkFrequency)
         
-    def Execute(self):      
-        #The satellite can be in one of the following states:
-        #1. We are waiting to send a beacon
-        #2. We have sent a beacon. Let's wait for a control packet or ack from the ground station. If we don't receive anything after a timeout, let's resend the beacon
-        #3. We have received a control packet. Let's send the requested data
-        #4. We have sent the requested data. Let's send a control packet to the ground station to let it know that we have sent the data
-        
-        _downlinkModel = self.__ownernode.has_ModelWithName("ModelDownlinkRadio")
-        if _downlinkModel is None:
-            raise Exception("Downlink radio model is not found for owner node: " + str(self.__ownernode.nodeID))
+    def __remove_AckedData(self, _acks, _timestamp):
+        """
+        @desc
+            This method removes the data acked by the bulk acks from the sent data and keeps the MAC units for later data
+        @param[in] _acks
+            Bulk acks addressed to this satellite. This should be the output of __sort_ReceivedData
+        @param[in] _timestamp
+            Current time of the owner node
+        """
+        #an acked MAC unit goes back to the pool one by one. So, the append of the pool is looked up once for all the acks
+        _returnToPool = self.__macDataPool.append
+        for _bulkAck in _acks:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Received ack " + str(_bulkAck), ELogType.LOGINFO, _timestamp, self.iName)
+            #The unacked data is moved to the front of the list in a single pass and the acked tail is cut off at once
+            #The ground station sends the IDs as a set. Any other container is converted once so that each lookup stays O(1)
+            _receivedIDs = _bulkAck.receivedMACDataIDs
+            if not isinstance(_receivedIDs, (set, frozenset)):
+                _receivedIDs = set(_receivedIDs)
+            _sentDataList = self.__sentData
+            _numKept = 0
+            for _sentData in _sentDataList:
+                if _sentData.id in _receivedIDs:
+                    if self.__logInfoEnabled:
+                        self.__logger.write_Log("Received ack for mac unit " + str(_sentData.id), \
+                            ELogType.LOGINFO, _timestamp, self.iName)
+                    #the acked MAC unit is not referred anymore. Let's keep it to carry a later data
+                    _sentData.dataPayload = None
+                    _returnToPool(_sentData)
+                else:
+                    #the write index never passes the read position. So, the loop only sees the entries not moved yet
+                    _sentDataList[_numKept] = _sentData
+                    _numKept += 1
+            del _sentDataList[_numKept:]
+    
+    def __handle_WaitingToBeacon(self, _receivedData, _timestamp):
+        """
+        @desc
+            State 1: We are waiting to send a beacon
+        @param[in] _receivedData
+            All the data received in this time step. It is dropped in this state. The parameter is kept as all the state handlers are called alike
+        @param[in] _timestamp
+            Current time of the owner node. The node keeps the same instance while the step runs
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        if _timestamp >= self.__nextBeaconTime:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Sending beacon", ELogType.LOGINFO, _timestamp, self.iName)
+            #Let's send a beacon
+            self.__send_Beacon(_timestamp)
+            self.__currentState = 2
+        return False
+    
+    def __handle_WaitingForFeedback(self, _receivedData, _timestamp):
+        """
+        @desc
+            State 2: We have sent a beacon. Let's wait for a control packet or ack from the ground station. If we don't receive anything after a timeout, let's resend the beacon
+        @param[in] _receivedData
+            All the data received in this time step
+        @param[in] _timestamp
+            Current time of the owner node. The node keeps the same instance while the step runs
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #Let's check if we have received a control packet, ack, or timeout
         
-        #let's get all of the data from the radio model
-        _receivedData = self.__get_ReceivedData(_downlinkModel)
+        _controlPacket, _acks = self.__sort_ReceivedData(_receivedData, self.__downlinkRadioID)
         
-        #State 1: We are waiting to send a beacon
-        if self.__currentState == 1:
-            if self.__ownernode.timestamp >= self.__nextBeaconTime:
-                self.__logger.write_Log("Sending beacon", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                #Let's send a beacon
-                self.__send_Beacon(_downlinkModel)
-                self.__currentState = 2
-        
-        #State 2: We have sent a beacon. Let's wait for a control packet or ack from the ground station. If we don't receive anything after a timeout, let's resend the beacon
-        elif self.__currentState == 2:
-            #Let's check if we have received a control packet, ack, or timeout
+        if _controlPacket is not None:
+            #In the off chance that we receive multiple control packets, the one with the highest amount of data requested is picked
+            self.__gsRadioID = _controlPacket.sourceRadioID 
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Received control packet from radio " + str(self.__gsRadioID), ELogType.LOGINFO, \
+                    _timestamp, self.iName)
             
-            _controlPackets = [x for x in _receivedData if isinstance(x, MACControl) and x.intendedRadioID == _downlinkModel.radioID]
-            _acks = [x for x in _receivedData if isinstance(x, MACBulkAck) and x.intendedRadioID == _downlinkModel.radioID]
+            #Now, any data that is left in __sentData is the data that we need to send. Move it back to __dataToSend
+            #We will send the 0th element of __dataToSend first, which will become the 0th element of __sentData
+            self.__dataToSend = deque(self.__sentData)
+            self.__sentData = []
             
-            if len(_controlPackets) > 0:
-                #In the off chance that we receive multiple control packets, we first check if any of them are from the current ground station. 
-                #If not, we pick the one with the highest amount of data requested
-                _controlPacket = max(_controlPackets, key = lambda x: x.numPacketsToSend)
-                    
-                self.__gsRadioID = _controlPacket.sourceRadioID 
-                self.__logger.write_Log("Received control packet from radio " + str(self.__gsRadioID), ELogType.LOGINFO, \
-                    self.__ownernode.timestamp, self.iName)
+            #Now, let's see if the control packet has requested more data than currently available. Get the data from the data store
+            _numWantedPackets = _controlPacket.numPacketsToSend
+            _dataStore = self._dataStore
+            _macDataPool = self.__macDataPool
+            while len(self.__dataToSend) < _numWantedPackets:
+                #Let's get the data object from the data store
+                _data = _dataStore.call_APIs("get_Data")
+                if _data is None:
+                    break
                 
-                #Now, any data that is left in __sentData is the data that we need to send. Move it back to __dataToSend
-                #We will send the 0th element of __dataToSend first, which will become the 0th element of __sentData
-                self.__dataToSend = self.__sentData.copy()
-                self.__sentData.clear()
+                #We need to convert it to a MACData object
+                #the data object is carried as is. The radio pickles the whole MAC unit on transmission
+                _size = _data.size + 4 #TODO: change this to the actual size
+                if _macDataPool:
+                    #an acked MAC unit is refilled. Its creation time is kept by the unit. So, it is updated in place
+                    _macData = _macDataPool.pop()
+                    _macData.creationTime.from_datetime(_timestamp.time)
+                    _macData.size = _size
+                    _macData.intendedRadioID = self.__gsRadioID
+                    _macData.sequenceNumber = self.__currentSequenceNumber
+                    _macData.dataPayload = _data
+                    _macData.renew_ID()
+                    _data = _macData
+                else:
+                    _time = _timestamp.copy()
+                    _data = MACData.new_Fast(_time, self.__downlinkRadioID, self.__gsRadioID, self.__currentSequenceNumber, _data, _size)
+                self.__currentSequenceNumber += 1
                 
-                #Now, let's see if the control packet has requested more data than currently available. Get the data from the data store
-                _numWantedPackets = _controlPacket.numPacketsToSend
-                _dataStore = self.__ownernode.has_ModelWithTag(EModelTag.DATASTORE)
-                while len(self.__dataToSend) < _numWantedPackets:
-                    #Let's get the data object from the data store
-                    _data = _dataStore.call_APIs("get_Data")
-                    if _data is None:
-                        break
-                    
-                    #We need to convert it to a MACData object
-                    _time = self.__ownernode.timestamp.copy()
-                    _size = _data.size + 4 #TODO: change this to the actual size
-                    _payload = pickle.dumps(_data)
-                    _data = MACData(creationTime=_time,
-                                    sourceRadioID=_downlinkModel.radioID,
-                                    size=_size,
-                                    intendedRadioID=self.__gsRadioID,
-                                    sequenceNumber=self.__currentSequenceNumber,
-                                    dataPayloadString=_payload)
-                    self.__currentSequenceNumber += 1
-                    
-                    self.__dataToSend.append(_data)
-                
-                #Now, let's send the requested data
-                self.__currentState = 3
-
-            #We get an ack if the ground station has received our data
-            elif len(_acks) > 0:
-                #We have received a bulk ack. We might receive multiple acks if there are multiple ground stations in range
-                #Let's remove all the acked data
-                for _bulkAck in _acks:
-                    self.__logger.write_Log("Received ack " + str(_bulkAck), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                    _ind = 0
-                    while _ind < len(self.__sentData):
-                        if self.__sentData[_ind].id in _bulkAck.receivedMACDataIDs:
-                            self.__logger.write_Log("Received ack for mac unit " + str(self.__sentData[_ind].id), \
-                                ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                            self.__sentData.pop(_ind)
-                            _ind -= 1
-                        _ind += 1
-                        
-                    #Let's just wait for when we need to send the next beacon
-                    self.__currentState = 1 
-            
-            #We get a timeout if we have not received a control packet or ack in a while. 
-            elif self.__ownernode.timestamp >= self.__nextBeaconTime:
-                self.__logger.write_Log("Timed out waiting for feedback. Resending beacon", ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                #We have not received a control packet or ack in a while. Let's resend the beacon        
-                self.__currentState = 1
+                self.__dataToSend.append(_data)
             
-        #State 3: After receiving a control packet, we send the requested data
-        if self.__currentState == 3:
-            #If we have data to send, send it
-            if len(self.__dataToSend) > 0:
-                #The radio model might be busy, so send the data if you can
-                _actuallySent = _downlinkModel.call_APIs("send_Packet", _packet = self.__dataToSend[0])
-                if _actuallySent:
+            #Now, let's send the requested data in this time step as well
+            self.__currentState = 3
+            return True
+
+        #We get an ack if the ground station has received our data
+        elif len(_acks) > 0:
+            #We have received a bulk ack. We might receive multiple acks if there are multiple ground stations in range
+            #Let's remove all the acked data
+            self.__remove_AckedData(_acks, _timestamp)
+                    
+            #Let's just wait for when we need to send the next beacon
+            self.__currentState = 1 
+        
+        #We get a timeout if we have not received a control packet or ack in a while. 
+        elif _timestamp >= self.__nextBeaconTime:
+            if self.__logInfoEnabled:
+                self.__logger.write_Log("Timed out waiting for feedback. Resending beacon", ELogType.LOGINFO, _timestamp, self.iName)
+            #We have not received a control packet or ack in a while. Let's resend the beacon        
+            self.__currentState = 1
+        return False
+    
+    def __handle_SendingData(self, _receivedData, _timestamp):
+        """
+        @desc
+            State 3: After receiving a control packet, we send the requested data
+        @param[in] _receivedData
+            All the data received in this time step
+        @param[in] _timestamp
+            Current time of the owner node. The node keeps the same instance while the step runs
+        @return
+            True if the next state should run in this time step, False otherwise
+        """
+        #The ground station may ack the received data before our control packet (see ack_count_threshold of ModelMACgs)
+        #The acked data is removed right away, so it is not counted in the control packet nor resent
+        if _receivedData:
+            _, _acks = self.__sort_ReceivedData(_receivedData, self.__downlinkRadioID)
+            if _acks:
+                self.__remove_AckedData(_acks, _timestamp)
+        
+        #If we have data to send, send it
+        if len(self.__dataToSend) > 0:
+            #The radio model might be busy, so send the data if you can
+            #The attempt is made even then as the radio logs every busy drop. So, only the dispatch is saved by the bound handler
+            _actuallySent = self.__sendPacket(_packet = self.__dataToSend[0])
+            if _actuallySent:
+                if self.__logInfoEnabled:
                     self.__logger.write_Log("Sent MACData " + str(self.__dataToSend[0].id) + " to radio " + str(self.__gsRadioID), \
-                        ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                    self.__sentData.append(self.__dataToSend[0])
-                    self.__dataToSend.pop(0)
-            else:
-                #We have sent all of the data we can. Let's send a control packet to the ground station to confirm that we have sent all of the data
+                        ELogType.LOGINFO, _timestamp, self.iName)
+                self.__sentData.append(self.__dataToSend.popleft())
+        else:
+            #We have sent all of the data we can. Let's send a control packet to the ground station to confirm that we have sent all of the data
+            if self.__logInfoEnabled:
                 self.__logger.write_Log("Sending Control. Sent " + str(len(self.__sentData)) + " packets to radio " + str(self.__gsRadioID), \
-                    ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-                
-                _time = self.__ownernode.timestamp.copy()
-                
-                _control = MACControl(creationTime=_time,
-                                        sourceRadioID=_downlinkModel.radioID,
+                    ELogType.LOGINFO, _timestamp, self.iName)
+            
+            #the control packet is pickled as soon as it is sent. So, one instance is reused for all the control packets with a new ID each time
+            _control = self.__control
+            if _control is None:
+                _control = MACControl(creationTime=_timestamp,
+                                        sourceRadioID=self.__downlinkRadioID,
                                         size=8, #TODO: change this to the actual size
                                         intendedRadioID=self.__gsRadioID,
                                         sequenceNumber=self.__currentSequenceNumber,
                                         numPacketsToSend=len(self.__sentData))
-                
-                _sucessful = _downlinkModel.call_APIs("send_Packet", _packet = _control)
-                
-                #If the radio is not busy, we should be able to send the control packet
-                #let's go back to state 2 to listen for the ground station's response
-                if _sucessful:
-                    self.__currentState = 2
-                    
+                self.__control = _control
+            else:
+                _control.intendedRadioID = self.__gsRadioID
+                _control.sequenceNumber = self.__currentSequenceNumber
+                _control.numPacketsToSend = len(self.__sentData)
+                _control.renew_ID()
+            
+            _sucessful = self.__sendPacket(_packet = _control)
+            
+            #If the radio is not busy, we should be able to send the control packet
+            #let's go back to state 2 to listen for the ground station's response
+            if _sucessful:
+                self.__currentState = 2
+        return False
+    
+    def Execute(self):      
+        #The satellite can be in one of the following states:
+        #1. We are waiting to send a beacon
+        #2. We have sent a beacon. Let's wait for a control packet or ack from the ground station. If we don't receive anything after a timeout, let's resend the beacon
+        #3. We have received a control packet. Let's send the requested data
+        #4. We have sent the requested data. Let's send a control packet to the ground station to let it know that we have sent the data. This is done on the way out of state 3
+        
+        #the downlink radio is resolved on the first step. It binds the radio handlers used below
+        self._downlink
+        #the time of the node is looked up once for the whole step
+        _timestamp = self.__ownernode.timestamp
+        
+        #State 1 does nothing until the next beacon is due. The received data would only be dropped in the meantime
+        #So, the step is skipped unless there is some data to drop. The RX queue then stays as it would have been otherwise
+        if self.__currentState == 1 and \
+            _timestamp < self.__nextBeaconTime and \
+            self.__isRxQueueEmpty():
+            return
+        
+        #let's get all of the data from the radio model. It hands over its whole RX queue in one call
+        _receivedData = self.__getAllReceivedPackets()
+        
+        #let's run the handler of the current state. A handler returns True if the state it moved to should also run in this timestep
+        _stateHandlers = self.__stateHandlers
+        while _stateHandlers[self.__currentState](_receivedData, _timestamp):
+            pass
+        
     def __init__(
             self, 
             _ownernodeins: INode, 
@@ -317,23 +416,49 @@ class ModelMACTTnC(IModel):
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        #the info messages are only built when the logger takes them. The level of a logger is fixed once it is created
+        self.__logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
+        
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
         
         self.__currentState = 1 #See execute() for the meaning of each state
         
         self.__beaconInterval = _beaconInterval
         self.__beaconBackoff = _beaconBackoff
+        #A private or pre-drawn generator would decouple the beacons from random.seed() and from the other models drawing from it.
+        #So, the module generator is kept and only its bound method is cached. randrange(n + 1) is randint(0, n) with one call less
+        self.__randrange = random.randrange
         self.__beaconFrequency = _beaconFrequency
         self.__downlinkFrequency = _downlinkFrequency
         
-        #We use lists instead of queues because we want to be able to remove elements from the middle of the list
-        self.__dataToSend: 'list[MACData]' = [] #List of the MACData units we need to send. 
+        #The data to send is only taken from the front. The sent data is filtered as a whole when an ack is received
+        self.__dataToSend: 'deque[MACData]' = deque() #Queue of the MACData units we need to send. 
         self.__sentData: 'list[MACData]' = [] #List of the MACData units we have sent but have not received an ack for. 
         
         self.__currentSequenceNumber = 0 #Sequence number of the next packet to send
         
         self.__gsRadioID = -1 #ID of the GS's radio that we are currently communicating with. 
+        
+        # the dependent models are resolved lazily on the first use as the owner node may not be fully set up yet
+        self.__downlinkRadio = None
+        self.__downlinkRadioID = None
+        self.__getAllReceivedPackets = None #Bound API handlers of the downlink radio model. Set along with the model
+        self.__isRxQueueEmpty = None
+        self.__sendPacket = None
+        self.__setFrequency = None
+        self.__dataStoreModel = None
+        
+        self.__beacon = None #beacon instance reused for every beacon sent. Created on the first beacon
+        self.__control = None #control packet instance reused for every control packet sent. Created on the first control packet
+        self.__macDataPool: 'list[MACData]' = [] #acked MACData units kept to carry the later data
         self.__nextBeaconTime = self.__ownernode.timestamp.copy().add_seconds(random.randint(self.__beaconInterval, self.__beaconInterval + self.__beaconBackoff)) #Time when we will send the next beacon
         self.__currentState = 1 #See execute() for the meaning of each state
+        #Handlers of the states indexed by the state number
+        self.__stateHandlers = (None, 
+                                self.__handle_WaitingToBeacon, 
+                                self.__handle_WaitingForFeedback, 
+                                self.__handle_SendingData)
         
 def init_ModelMACTTnC(
                     _ownernodeins: INode, 
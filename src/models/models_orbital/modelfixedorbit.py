@@ -9,6 +9,9 @@ Created on: 8 June 2023
     This is an orbital model class used for testing purposes. You can pass in a location, and the satellite will be CONSTANTLY at that location.
 """
 
+import math
+from types import MethodType
+
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import INode
 from src.simlogging.ilogger import ELogType, ILogger
@@ -20,33 +23,14 @@ class ModelFixedOrbit(IModel):
     This model class basically calculates the orbital propagation of the satellite based on the TLE.
     It takes the timestamp of the node and updates the location of the node, i.e., satellite
     '''
-    __modeltag = EModelTag.ORBITAL
+    #the name, tag, supported nodes and dependencies are the same for all instances. So, they are plain class attributes instead of the properties of IModel
+    iName = 'ModelFixedOrbit'
+    modelTag = EModelTag.ORBITAL
     __ownernode: INode
-    __supportednodeclasses = ['SatelliteBasic']
-    __dependencies = []
+    supportedNodeClasses = ['SatelliteBasic']
+    dependencyModelClasses = []
     __logger: ILogger
-
-    
-    @property
-    def iName(self) -> str:
-        """
-        @type 
-            str
-        @desc
-            A string representing the name of the model class. For example, ModelPower 
-        """
-        return self.__class__.__name__
     
-    @property
-    def modelTag(self) -> EModelTag:
-        """
-        @type
-            EModelTag
-        @desc
-            The model tag for the implemented model
-        """
-        return self.__modeltag
-
     @property
     def ownerNode(self):
         """
@@ -59,33 +43,6 @@ class ModelFixedOrbit(IModel):
         """
         return self.__ownernode
     
-    @property
-    def supportedNodeClasses(self) -> 'list[str]':
-        '''
-        @type
-            List of string
-        @desc
-            A model may not support all the node implementation. 
-            supportedNodeClasses gives the list of names of the node implementation classes that it supports.
-            For example, if a model supports only the SatBasic and SatAdvanced, the list should be ['SatBasic', 'SatAdvanced']
-            If the model supports all the node implementations, just keep the list EMPTY.
-        '''
-        return self.__supportednodeclasses
-    
-    @property
-    def dependencyModelClasses(self) -> 'list[list[str]]':
-        '''
-        @type
-            Nested list of string
-        @desc
-            dependencyModelClasses gives the nested list of name of the model implementations that this model has dependency on.
-            For example, if a model has dependency on the ModelPower and ModelOrbitalBasic, the list should be [['ModelPower'], ['ModelOrbitalBasic']].
-            Now, if the model can work with EITHER of the ModelOrbitalBasic OR ModelOrbitalAdvanced, the these two should come under one sublist looking like [['ModelPower'], ['ModelOrbitalBasic', 'ModelOrbitalAdvanced']]. 
-            So each exclusively dependent model should be in a separate sublist and all the models that can work with either of the dependent models should be in the same sublist.
-            If your model does not have any dependency, just keep the list EMPTY. 
-        '''
-        return self.__dependencies
-    
     def __in_Sunlight(self, **_kwargs) -> bool:
         '''
         This method checks if the satellite is in sunlight
@@ -107,9 +64,14 @@ class ModelFixedOrbit(IModel):
         @return
             Tuple (distance, relative velocity) in m and m/s respectively
         '''
-        pos = self.__ownernode.get_Position()
-        gsPos = _kwargs['_gs'].get_Position()
-        dist = pos.get_distance(gsPos)
+        #Neither the satellite nor the ground device moves. So, the distance to a ground device is computed once and cached by its node ID
+        _gs = _kwargs['_gs']
+        dist = self.__distanceCache.get(_gs.nodeID)
+        if dist is None:
+            pos = self.__position
+            gsPos = _gs.get_Position()
+            dist = math.sqrt((pos.x - gsPos.x)**2 + (pos.y - gsPos.y)**2 + (pos.z - gsPos.z)**2)
+            self.__distanceCache[_gs.nodeID] = dist
         
         return (dist, 0) 
     
@@ -135,7 +97,8 @@ class ModelFixedOrbit(IModel):
         @return
             The velocity of the satellite at the given time (x, y, z) in m/s (tuple of floats)
         """
-        return (0, 0, 0)
+        #the satellite never moves. The literal is a constant of the function, so the same tuple is returned on every call
+        return (0.0, 0.0, 0.0)
     
     # API dictionary where API name is the key and handler function is the value
     __apiHandlerDictionary = {
@@ -159,14 +122,12 @@ class ModelFixedOrbit(IModel):
         @return
             The API return
         '''
-        _ret = None
+        _handler = self.__apiHandlers.get(_apiName)
+        if _handler is None:
+            self.__logger.write_Log(f"An unhandled API request has been received by {self.__ownernode.nodeID}: {_apiName}", ELogType.LOGERROR, self.__ownernode.timestamp, self.iName)
+            return None
         
-        try:
-            _ret = self.__apiHandlerDictionary[_apiName](self, **_kwargs)
-        except Exception as e:
-            print(f"[ModelFixedOrbit]: An unhandled API request has been received by {self.__ownernode.nodeID}:", e)
-        
-        return _ret
+        return _handler(**_kwargs)
         
     def __init__(
             self, 
@@ -191,12 +152,17 @@ class ModelFixedOrbit(IModel):
 
         self.__ownernode = _ownernodeins
         self.__logger = _loggerins
+        
+        # Bind the API handlers once, so that call_APIs dispatches with a single lookup
+        self.__apiHandlers = {_apiName: MethodType(_handler, self) for _apiName, _handler in self.__apiHandlerDictionary.items()}
 
         self.__position = _pos
         self.__sunlit = _sunlit
+        
+        self.__distanceCache: 'dict[int, float]' = {} #Distance (m) to the ground devices keyed by their node ID
 
     def __str__(self) -> str:
-        return "".join(["Model name: ", self.iName, ", " , "Model tag: ", self.__modeltag.__str__()])
+        return "".join(["Model name: ", self.iName, ", " , "Model tag: ", self.modelTag.__str__()])
 
     def Execute(self):
         """
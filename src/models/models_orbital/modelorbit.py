@@ -9,16 +9,101 @@ Created on: 27 Oct 2022
     This module implements the orbital propagation model for the satellite.  
 """
 import numpy as np
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import INode
 from src.simlogging.ilogger import ELogType, ILogger
 from skyfield.api import load, wgs84, EarthSatellite
 from skyfield.framelib import itrs
-from skyfield.positionlib import build_position, Barycentric
+from skyfield.nutationlib import iau2000b_radians
+from skyfield.positionlib import Barycentric
+from skyfield.constants import DAY_S, ERAD
+from sgp4.api import jday
 from src.utils import Location, Time
 
+# The skyfield time scale and the ephemeris are only read once loaded. So, all the ModelOrbit instances of a process share them
+_sharedTimescale = None
+_sharedEphemeris = None
+
+def _load_SharedTimescale():
+    """
+    @desc
+        This function returns the skyfield time scale shared by the ModelOrbit instances. It is loaded on the first call
+    @return
+        Skyfield Timescale instance
+    """
+    global _sharedTimescale
+    if _sharedTimescale is None:
+        _sharedTimescale = load.timescale()
+    return _sharedTimescale
+
+def _load_SharedEphemeris():
+    """
+    @desc
+        This function returns the ephemeris shared by the ModelOrbit instances. The file is opened on the first call
+    @return
+        Skyfield SpiceKernel instance of the ephemeris file
+    """
+    global _sharedEphemeris
+    if _sharedEphemeris is None:
+        _sharedEphemeris = load("./dependencies/de440s.bsp") #ephemeris file. This is a binary file that contains the positions of the earth and the sun. 
+        #NASA JPL Horizons Ephemeris Service: https://ssd.jpl.nasa.gov/ephem.html provides the ephemeris file 
+    return _sharedEphemeris
+
+# The satellites are asked for their positions at the same few times again and again, e.g., the time step and the pass windows of the ground stations
+# So, the skyfield times of the recently asked times are kept. A skyfield time computes the earth orientation on the first use and keeps it
+# This way, the satellites sharing a time compute the earth orientation only once
+@lru_cache(maxsize = 1024)
+def _get_SkyfieldTime(
+        _timescale, 
+        _datetime: datetime):
+    """
+    @desc
+        This function returns the skyfield time of a datetime. The times of the last 1024 distinct datetimes are reused
+    @param[in]  _timescale
+        Skyfield time scale to create the time with
+    @param[in]  _datetime
+        The datetime to convert
+    @return
+        Skyfield Time instance
+    """
+    return _timescale.utc(_datetime)
+
+def _is_SunlitApprox(
+        _positions: np.ndarray, 
+        _julianDates: np.ndarray) -> np.ndarray:
+    """
+    @desc
+        This function tells whether the positions are in sunlight with a closed form test of the earth's shadow.
+        The earth is taken as a sphere and its shadow as a cylinder. 
+        The sun direction comes from the low precision formula of the Astronomical Almanac, which is accurate to about 0.01 degree
+    @param[in]  _positions
+        Positions (km) in the TEME frame as an array of shape (3, N)
+    @param[in]  _julianDates
+        Julian dates (UTC) of the positions as an array of shape (N,)
+    @return
+        Boolean array of shape (N,). True if the position is in sunlight
+    """
+    _days = _julianDates - 2451545.0
+    _meanLongitude = np.radians(280.460 + 0.9856474 * _days)
+    _meanAnomaly = np.radians(357.528 + 0.9856003 * _days)
+    _eclipticLongitude = _meanLongitude + np.radians(1.915 * np.sin(_meanAnomaly) + 0.020 * np.sin(2 * _meanAnomaly))
+    _obliquity = np.radians(23.439 - 0.0000004 * _days)
+    
+    #unit vector towards the sun in the equator and equinox of date. TEME differs from this frame by the nutation only
+    _sunX = np.cos(_eclipticLongitude)
+    _sunY = np.cos(_obliquity) * np.sin(_eclipticLongitude)
+    _sunZ = np.sin(_obliquity) * np.sin(_eclipticLongitude)
+    
+    #a position is in sunlight if it is on the day side or farther than the earth radius from the earth-sun line
+    _alongSun = _positions[0] * _sunX + _positions[1] * _sunY + _positions[2] * _sunZ
+    _distanceSquared = np.sum(_positions * _positions, axis = 0)
+    _earthRadius = ERAD / 1000.0
+    return (_alongSun > 0) | (_distanceSquared - _alongSun * _alongSun > _earthRadius * _earthRadius)
+
 class ModelOrbit(IModel):
     '''
     This model class basically calculates the orbital propagation of the satellite based on the TLE.
@@ -102,7 +187,7 @@ class ModelOrbit(IModel):
         @return
             True if the satellite is in sunlight, false otherwise
         '''
-        if self.__timesAndSunlight is None:
+        if self.__sunlitSwitchTimes is None:
             #Let's calculate all the sunlight times at once for the whole simulation
             _startTime = self.__ownernode.simStartTime.to_datetime()
             _endTime = self.__ownernode.simEndTime.to_datetime()
@@ -122,71 +207,80 @@ class ModelOrbit(IModel):
             if _secondsInSimulation < _granularity:
                 _granularity = _secondsInSimulation
                 
-            #Let's setup some lambdas so we can keep calling them multiple times
-            _convertDatetimeToSkyfieldTime = lambda _datetime: self.__skyfieldts.utc(_datetime.year, _datetime.month, _datetime.day, \
-                _datetime.hour, _datetime.minute, _datetime.second)
-            _getSunlit = lambda _times: self.__earthsatellite.at(_times).is_sunlit(self.__ephem)
+            #Let's setup a function so we can keep calling it multiple times
+            #Most of a call goes to the IAU 2000A nutation of the times. Like the event searches of skyfield's almanac, the IAU 2000B nutation is used instead
+            #It is accurate to a milliarcsecond, i.e., a few centimeters in the position of a satellite, which is far below the whole second status checks
+            def _getSunlit(_times):
+                _times._nutation_angles_radians = iau2000b_radians(_times)
+                return self.__earthsatellite.at(_times).is_sunlit(self.__ephem)
             
             #Let's first find the sunlight status for our starting granularity
-            _times = self.__skyfieldts.utc(_startTime.year, _startTime.month, _startTime.day, \
-                _startTime.hour, _startTime.minute, np.arange(0, (_endTime - _startTime).total_seconds(), _granularity))
+            #This status only tells which intervals have a switch, and the switches are refined with skyfield below. So, a closed form shadow test is enough here
+            #It runs on the raw SGP4 positions, which skips the rotation to the GCRS frame and the ephemeris that make up most of a skyfield call
+            _julianDay, _dayFraction = jday(_startTime.year, _startTime.month, _startTime.day, _startTime.hour, _startTime.minute, 0)
+            _dayFractions = _dayFraction + np.arange(0, (_endTime - _startTime).total_seconds(), _granularity) / DAY_S
+            _, _positions, _ = self.__earthsatellite.model.sgp4_array(np.full(_dayFractions.shape, _julianDay), _dayFractions)
             
-            _sunlits = _getSunlit(_times)
+            _sunlits = _is_SunlitApprox(_positions.T, _julianDay + _dayFractions)
             
             #Now, let's find all the times when the status changes
             #Find all the indexes where it switches from T to F or F to T
             _sunlitIndexes = np.where(np.diff(_sunlits) != 0)[0] #This is an array of indexes. This is the index of the first element of the pair
             
-            _endTimesAndSunlight = [] #tuple of (datetime, bool)
-            
             #Now, we need to find the exact timestep when the status changes. Let's keep binary searching until we reach the desired granularity
+            #All the switches are searched together. So, each round checks the midpoints of all the unfinished searches in a single skyfield call
             _desiredGranularity = self.__ownernode.deltaTime 
-            for _index in _sunlitIndexes:
-                _currentGranularity = _granularity
-                _startInSunlight = _sunlits[_index]
-                
-                _currentStartTime = _startTime + timedelta(seconds = float(_index * _granularity))
-                _currentEndTime = _currentStartTime + timedelta(seconds = _currentGranularity)
+            _startInSunlights = [_sunlits[_index] for _index in _sunlitIndexes]
+            _currentStartTimes = [_startTime + timedelta(seconds = float(_index * _granularity)) for _index in _sunlitIndexes]
+            _currentEndTimes = [_currentStartTime + timedelta(seconds = _granularity) for _currentStartTime in _currentStartTimes]
+            _currentGranularities = [_granularity] * len(_sunlitIndexes)
+            
+            _searching = [_idx for _idx in range(len(_sunlitIndexes)) if _granularity > _desiredGranularity]
+            while len(_searching) > 0:
+                #Let's calculate the midpoints' states between the start and end times
+                _midTimes = [_currentStartTimes[_idx] + timedelta(seconds = _currentGranularities[_idx] / 2) for _idx in _searching]
+                #The state is checked at the whole second of a midpoint
+                _midInSunlights = _getSunlit(self.__skyfieldts.utc([_midTime.year for _midTime in _midTimes], 
+                                                                    [_midTime.month for _midTime in _midTimes], 
+                                                                    [_midTime.day for _midTime in _midTimes], 
+                                                                    [_midTime.hour for _midTime in _midTimes], 
+                                                                    [_midTime.minute for _midTime in _midTimes], 
+                                                                    [_midTime.second for _midTime in _midTimes]))
                 
-                while _currentGranularity > _desiredGranularity:
-                    #Let's calculate the midpoint's state between the start and end time
-                    _midTime = _currentStartTime + timedelta(seconds = _currentGranularity / 2)
-                    _midInSunlight = _getSunlit(_convertDatetimeToSkyfieldTime(_midTime))
-                    
-                    if _midInSunlight == _startInSunlight:
+                for _idx, _midTime, _midInSunlight in zip(_searching, _midTimes, _midInSunlights):
+                    if _midInSunlight == _startInSunlights[_idx]:
                         #The switch happens in the right half
-                        _currentStartTime = _midTime
+                        _currentStartTimes[_idx] = _midTime
                     else:
                         #The switch happens in the left half
-                        _currentEndTime = _midTime
+                        _currentEndTimes[_idx] = _midTime
                         
-                    _currentGranularity = (_currentEndTime - _currentStartTime).total_seconds()
+                    _currentGranularities[_idx] = (_currentEndTimes[_idx] - _currentStartTimes[_idx]).total_seconds()
                 
-                _endTimesAndSunlight.append((_currentEndTime, not _startInSunlight))
-                        
-            _timesAndSunlight = []
-            #Now, let's create a list of (timeToChange, isSunlit) tuples
-            for _endDateTimeAndSunlight in _endTimesAndSunlight:
-                _time = Time().from_datetime(_endDateTimeAndSunlight[0])
-                _sunlit = _endDateTimeAndSunlight[1]
-                _timesAndSunlight.append((_time, _sunlit))
+                _searching = [_idx for _idx in _searching if _currentGranularities[_idx] > _desiredGranularity]
+            
+            #Now, let's keep the switches as two parallel lists: the time of each switch and the sunlight status until then
+            #The times are kept as the datetimes of our own time format, so that they compare directly with the time of the node
+            _switchTimes = [Time().from_datetime(_currentEndTime).time for _currentEndTime in _currentEndTimes]
+            _sunlitStates = [bool(_startInSunlight) for _startInSunlight in _startInSunlights]
             
             #Add another entry in the variable for the end time. This is to ensure that [last switch, end time] is also covered
-            _timesAndSunlight.append((Time().from_datetime(_endTime).add_seconds(_granularity), not _sunlits[-1]))
+            _switchTimes.append(Time().from_datetime(_endTime).add_seconds(_granularity).time)
+            _sunlitStates.append(bool(_sunlits[-1]))
             
-            self.__timesAndSunlight = _timesAndSunlight 
+            self.__sunlitSwitchTimes = _switchTimes
+            self.__sunlitStates = _sunlitStates
+            self.__sunlitCursor = 0
 
-        #Now, let's find the sunlight status for the current time
-        _sunlit = False
-        _currTime = self.__ownernode.timestamp
-        for _idx in range(len(self.__timesAndSunlight)):
-            if self.__timesAndSunlight[_idx][0] >= _currTime:
-                _sunlit = not self.__timesAndSunlight[_idx][1]
-                if _idx > 0:
-                    self.__timesAndSunlight = self.__timesAndSunlight[_idx:]
-                break
-        
-        return _sunlit
+        #Now, let's find the sunlight status for the current time. It is the status until the first switch that is not before now
+        #The time of the node only moves forward. So, the search resumes from the switch found in the last call
+        _switchTimes = self.__sunlitSwitchTimes
+        _cursor = bisect_left(_switchTimes, self.__ownernode.timestamp.time, self.__sunlitCursor)
+        self.__sunlitCursor = _cursor
+        
+        if _cursor == len(_switchTimes):
+            return False
+        return self.__sunlitStates[_cursor]
 
     def __get_RelativeMotion(self, **_kwargs) -> 'Tuple[float, float]':
         '''
@@ -198,30 +292,30 @@ class ModelOrbit(IModel):
         @return
             Tuple (distance, relative velocity) in m and m/s respectively
         '''
-        pos = self.__ownernode.get_Position()
-        if pos is None:
-            raise Exception("[In ModelOrbit] Position is not set")
         _time = self.__ownernode.timestamp
         if _time is None:
             raise Exception("[In ModelOrbit] Timestamp is not set")
         if '_gs' not in _kwargs:
             raise Exception("[In ModelOrbit] Ground station position not provided")
         
-        _gsPos = _kwargs['_gs'].get_Position()
-        
-        _satPosTup = np.array(pos.to_tuple()) # (x,y,z) in m in ITRF frame
-        _gsPosTup = np.array(_gsPos.to_tuple()) # (x,y,z) in m in ITRF frame
-        _metres_to_au = 1.496e11 #meters to astronomical units
+        #the ground device does not move in the ITRF frame. So, its position is converted to an array once and cached by its node ID
+        _gs = _kwargs['_gs']
+        _gsPosArray = self.__groundPositionCache.get(_gs.nodeID)
+        if _gsPosArray is None:
+            _gsPos = _gs.get_Position()
+            _gsPosArray = np.array((_gsPos.x, _gsPos.y, _gsPos.z)) # (x,y,z) in m in ITRF frame
+            self.__groundPositionCache[_gs.nodeID] = _gsPosArray
         
-        _satPos = build_position(position_au = _satPosTup*_metres_to_au, t=_time, center=itrs)
-        _gsPos = build_position(position_au = _gsPosTup*_metres_to_au, t=_time, center=itrs)
+        #the velocity of the satellite is taken in the ITRF frame too. So, the ground device is at rest and only the satellite moves
+        _utcTime = _get_SkyfieldTime(self.__skyfieldts, _time.to_datetime())
+        _satPos, _satVel = self.__earthsatellite.at(_utcTime).frame_xyz_and_velocity(itrs)
         
-        _, _, dist, _, _, range_rate = _satPos.frame_latlon_and_rates(_gsPos)
-        dist = dist.m
-        range_rate = range_rate.m_per_s
+        _relPos = _satPos.m - _gsPosArray
+        dist = float(np.sqrt(_relPos @ _relPos))
+        range_rate = float(_relPos @ _satVel.m_per_s) / dist
         
         self.__logger.write_Log("Satellite is moving with distance {} with a speed of {} from {}". \
-                                                format(dist, range_rate, _kwargs['_gs'].name), \
+                                                format(dist, range_rate, _gs.nodeID), \
                                                     ELogType.LOGINFO, self.__ownernode.timestamp)
         return (dist, range_rate)
     
@@ -260,8 +354,8 @@ class ModelOrbit(IModel):
         
         #We need to add a buffer of 10 minutes to the start and end time
         #If not, there is a chance that the pass is missed: https://github.com/skyfielders/python-skyfield/issues/856
-        _startTs = self.__skyfieldts.utc(_start.copy().add_seconds(-10*60).to_datetime())
-        _endTs = self.__skyfieldts.utc(_end.copy().add_seconds(10*60).to_datetime())
+        _startTs = _get_SkyfieldTime(self.__skyfieldts, _start.copy().add_seconds(-10*60).to_datetime())
+        _endTs = _get_SkyfieldTime(self.__skyfieldts, _end.copy().add_seconds(10*60).to_datetime())
         
         lat, lon, alt = gs.lat, gs.lon, gs.alt 
         gsPos = wgs84.latlon(lat, lon, elevation_m=alt)
@@ -270,13 +364,16 @@ class ModelOrbit(IModel):
         _t, _events = self.__earthsatellite.find_events(gsPos, _startTs, _endTs, altitude_degrees=_kwargs['_minElevation'])    
         
         #events = 0 for enter, 1 for maximum, 2 for exit
-        #we only need the enter and exit events
-        _cleanedList = [(ti, event) for ti, event in zip(_t, _events) if event != 1]
-                
-        #let's convert the list to our own time format
-        _cleanedList = [(Time().from_datetime(ti.utc_datetime()), event) for ti, event in _cleanedList]
-        #let's only consider ones that are in the time range
-        _cleanedList = [(ti, event) for ti, event in _cleanedList if ti >= _start and ti <= _end]
+        #we only need the enter and exit events. They are picked with a mask and converted to datetimes in one skyfield call
+        _isEnterOrExit = _events != 1
+        _events = _events[_isEnterOrExit]
+        _datetimes = _t[_isEnterOrExit].utc_datetime()
+        
+        #let's only consider ones that are in the time range. Only these are converted to our own time format
+        _startDatetime = _start.time
+        _endDatetime = _end.time
+        _cleanedList = [(Time().from_datetime(_datetime), _event) for _datetime, _event in zip(_datetimes, _events) 
+                        if _startDatetime <= _datetime <= _endDatetime]
         
         #if the list is empty, return empty lis
         if len(_cleanedList) == 0:
@@ -317,7 +414,7 @@ class ModelOrbit(IModel):
         if not isinstance(_time, Time):
             raise Exception("[In ModelOrbit] Time is not set/valid")
         
-        _utcTime = self.__skyfieldts.utc(_time.to_datetime())
+        _utcTime = _get_SkyfieldTime(self.__skyfieldts, _time.to_datetime())
 
         # calculate the location
         _gcrsLocation = self.__earthsatellite.at(_utcTime)
@@ -343,7 +440,7 @@ class ModelOrbit(IModel):
         if not isinstance(_time, Time):
             raise Exception("[In ModelOrbit] Time is not set/valid")
         
-        _utcTime = self.__skyfieldts.utc(_time.to_datetime())
+        _utcTime = _get_SkyfieldTime(self.__skyfieldts, _time.to_datetime())
         _gcrsLocation = self.__earthsatellite.at(_utcTime)
         _vel = _gcrsLocation.velocity.m_per_s
         return (_vel[0], _vel[1], _vel[2])
@@ -369,7 +466,7 @@ class ModelOrbit(IModel):
             raise Exception(f"Invalid number of TLE lines in {self.iName}")
         
         #initiate the time scale for skyfield operation 
-        self.__skyfieldts = load.timescale()
+        self.__skyfieldts = _load_SharedTimescale()
         
     def __remove_Skyfield(self, **kwargs):
         '''
@@ -441,12 +538,16 @@ class ModelOrbit(IModel):
         self.__skyfieldts = None
         self.__setup_Skyfield()
         
-        self.__ephem = load("./dependencies/de440s.bsp") #ephemeris file. This is a binary file that contains the positions of the earth and the sun. 
-        #NASA JPL Horizons Ephemeris Service: https://ssd.jpl.nasa.gov/ephem.html provides the ephemeris file 
+        self.__ephem = _load_SharedEphemeris() #ephemeris of the earth and the sun. Shared by all the instances
         
         self.__alwaysCalculate = _alwaysCalculate
         
-        self.__timesAndSunlight = None #list of tuples of the form (time, inSunlight). See __in_Sunlight for more details 
+        #See __in_Sunlight for more details on the sunlight switches
+        self.__sunlitSwitchTimes = None #list of the times (datetime) at which the sunlight status changes
+        self.__sunlitStates = None #list of the sunlight status until the switch at the same index
+        self.__sunlitCursor = 0 #index of the first switch that is not before the time of the last in_Sunlight call
+        
+        self.__groundPositionCache: 'dict[int, np.ndarray]' = {} #ITRF position (m) of the ground devices keyed by their node ID
         
     def __str__(self) -> str:
         return "".join(["Model name: ", self.iName, ", " , "Model tag: ", self.__modeltag.__str__()])
@@ -464,7 +565,7 @@ class ModelOrbit(IModel):
             # calculate the time of the node
             _nodeTime = self.__ownernode.timestamp
             #In the method call below, the position will be calculated and stored in the satellitebasic's position dictionary
-            _newLocation = self.__get_Position({'_time': _nodeTime})
+            _newLocation = self.__get_Position(_time = _nodeTime)
         #If not alwaysCalculate, then the position of the node will be calculated & updated when the get_Position API is called
         #This API is currently called by the satellitebasic's get_Position method
         
@@ -493,7 +594,7 @@ def init_ModelOrbit(
 
     _alwaysCalc = False
     if hasattr(_modelArgs, 'always_calculate'):
-        _alwaysCalc = _modelArgs['always_calculate']
+        _alwaysCalc = _modelArgs.always_calculate
     else:
         _loggerins.write_Log("always_calculate not provided provided. Defaulting to False", ELogType.LOGWARN, _ownernodeins.timestamp, "ModelOrbit")
         
@@ -13,9 +13,46 @@ Created on: 21 Dec 2022
 from src.models.imodel import IModel, EModelTag
 from src.nodes.inode import INode
 from src.simlogging.ilogger import ELogType, ILogger
-from skyfield.api import load, EarthSatellite
+from skyfield.api import EarthSatellite
+from src.models.models_orbital.modelorbit import _load_SharedTimescale
 from src.utils import Location, Time
 
+# All the satellites of a simulation are propagated over the same time steps. So, the skyfield times of the last simulation period asked are kept
+# The skyfield times compute the earth orientation of all the time steps on the first propagation and keep it. So, it is computed only once per simulation
+_lastSimSkyfieldTimes = (None, None)
+
+def _get_SimSkyfieldTimes(
+        _simStartTime: Time,
+        _simEndTime: Time,
+        _simInterval: float):
+    """
+    @desc
+        This function returns the time steps of a simulation period and their skyfield times. 
+        The ones of the last simulation period are reused if the period is the same
+    @param[in]  _simStartTime
+        Start time of the simulation
+    @param[in]  _simEndTime
+        End time of the simulation
+    @param[in]  _simInterval
+        Time (seconds) between two time steps
+    @return
+        Tuple (list of the time steps as Time, skyfield Time array of the same time steps)
+    """
+    global _lastSimSkyfieldTimes
+    _key = (_simStartTime.to_datetime(), _simEndTime.to_datetime(), _simInterval)
+    _lastKey, _simTimes = _lastSimSkyfieldTimes
+    if _lastKey != _key:
+        _nodeTimes = []
+        _nodeTime = _simStartTime.copy()
+        while _nodeTime <= _simEndTime:
+            _nodeTimes.append(_nodeTime.copy())
+            _nodeTime.add_seconds(_simInterval)
+        
+        _simTimes = (_nodeTimes, _load_SharedTimescale().utc([_nodeTime.to_datetime() for _nodeTime in _nodeTimes]))
+        #the whole entry is replaced in one assignment. So, the worker threads always see a consistent entry
+        _lastSimSkyfieldTimes = (_key, _simTimes)
+    return _simTimes
+
 class ModelOrbitOneFullUpdate(IModel):
     '''
     This model class calculates the orbital propagation of the satellite based on the TLE. 
@@ -169,19 +206,13 @@ class ModelOrbitOneFullUpdate(IModel):
             else:
                 raise Exception("[Simulator Exception] Invalid number of TLE lines in " + self.iName)
         
-            #initiate the time scale for skyfield operation 
-            self.__skyfieldts = load.timescale()
-
-            _nodeTime = self.__simStartTime
-
-            while _nodeTime  <= self.__simEndTime:
-                # calculate the time of the node
-                _utcTime = self.__skyfieldts.utc(_nodeTime.to_datetime())
+            # the time steps are shared with the other satellites. So, the whole period is propagated in one go
+            _nodeTimes, _utcTimes = _get_SimSkyfieldTimes(self.__simStartTime, self.__simEndTime, self.__simInterval)
+            _itrs = self.__earthsatellite.at(_utcTimes).itrf_xyz().m
 
+            for _index, _nodeTime in enumerate(_nodeTimes):
                 # calculate the location
-                _gcrsLocation = self.__earthsatellite.at(_utcTime)
-                _itrs = _gcrsLocation.itrf_xyz().m
-                _newLocation = Location(_itrs[0], _itrs[1], _itrs[2])
+                _newLocation = Location(_itrs[0][_index], _itrs[1][_index], _itrs[2][_index])
 
                 self.__logger.write_Log(
                                     f"Location of node {self.__ownernode.nodeID} is: {_newLocation.to_str()}",
@@ -190,9 +221,6 @@ class ModelOrbitOneFullUpdate(IModel):
 
                 # update the location
                 self.__ownernode.update_Position(_newLocation, _nodeTime)
-
-                # update the time for the next position
-                _nodeTime.add_seconds(self.__simInterval)
             
             # remember to set the flag to avoid multiple updates
             self.__isPositionUpdated = True
@@ -112,6 +112,35 @@ class ModelPower(IModel):
         """
         _ret = False
         
+        _energyToConsume, _loggerTag = self.__get_EnergyToConsume(_kwargs)
+        
+        if self.__currentCharge >= _energyToConsume + self.__minCharge:
+            self.__currentCharge -= _energyToConsume
+            _ret = True
+            
+        else:
+            _energyToConsume = 0    
+            self.__logger.write_Log("Not enough power to consume. Current charge: {} J, Required charge: {} J"\
+                                .format(self.__currentCharge, _energyToConsume), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
+            _ret = False
+        
+        #Let's store this for our stats logging
+        self.__tagsConsumedLoggerDict[_loggerTag] += _energyToConsume
+        
+        return _ret
+    
+    def __get_EnergyToConsume(
+                        self,
+                        _kwargs: dict) -> 'tuple[float, str]':
+        """
+        @desc
+            This method finds the energy of an operation from the keyworded arguments of the consume APIs.
+            See consume_Energy for the options.
+        @param[in]  _kwargs
+            keyworded arguments of the consume API
+        @return
+            A tuple of the energy to be consumed in Joules and the tag to log the consumption against
+        """
         _energyToConsume = 0
         _loggerTag = "Other"
         
@@ -138,20 +167,42 @@ class ModelPower(IModel):
             self.__powerConsumptionDict[_kwargs["_tag"]] = 0
             
             _energyToConsume = 0
-        if self.__currentCharge >= _energyToConsume + self.__minCharge:
-            self.__currentCharge -= _energyToConsume
-            _ret = True
-            
+        
+        return _energyToConsume, _loggerTag
+    
+    def __consume_Energy_Batch(
+                        self,
+                        **_kwargs) -> int:
+        """
+        @desc
+            This method consumes energy from the battery for a number of identical operations in one call.
+            The operations are granted one after another until the battery reaches the minimum charge.
+        @param[in]  _kwargs
+            keyworded arguments that contain the following arguments:
+                _kwargs["_count"]: 'int'
+                    Number of operations
+                The energy of one operation is given with the same options as in consume_Energy
+        @return
+            Number of operations for which the energy was consumed
+        """
+        _count = _kwargs["_count"]
+        _energyToConsume, _loggerTag = self.__get_EnergyToConsume(_kwargs)
+        
+        if _energyToConsume <= 0:
+            _granted = _count
         else:
-            _energyToConsume = 0    
-            self.__logger.write_Log("Not enough power to consume. Current charge: {} J, Required charge: {} J"\
-                                .format(self.__currentCharge, _energyToConsume), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
-            _ret = False
+            _granted = min(_count, max(0, int((self.__currentCharge - self.__minCharge) // _energyToConsume)))
+        
+        self.__currentCharge -= _granted * _energyToConsume
+        
+        if _granted < _count:
+            self.__logger.write_Log("Not enough power to consume for {} of {} operations. Current charge: {} J, Required charge: {} J"\
+                                .format(_count - _granted, _count, self.__currentCharge, _energyToConsume), ELogType.LOGINFO, self.__ownernode.timestamp, self.iName)
         
         #Let's store this for our stats logging
-        self.__tagsConsumedLoggerDict[_loggerTag] += _energyToConsume
+        self.__tagsConsumedLoggerDict[_loggerTag] += _granted * _energyToConsume
         
-        return _ret
+        return _granted
     
     def __get_AvailableEnergy(
                             self,
@@ -231,6 +282,7 @@ class ModelPower(IModel):
     # API dictionary where API name is the key and handler function is the value
     __apiHandlerDictionary = {
         "consume_Energy": __consume_Energy,
+        "consume_Energy_Batch": __consume_Energy_Batch,
         "get_AvailableEnergy": __get_AvailableEnergy,
         "get_MinCharge": _get_MinCharge,
         "get_MaxCharge": _get_MaxCharge,
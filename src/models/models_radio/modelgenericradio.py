@@ -10,6 +10,7 @@ Created on: 1 Feb 2023
     This model has two frame queues - reception and transmission which can be accessed externally through the appropriate APIs
 '''
 from queue import Queue
+from collections import deque
 import pickle
 from abc import ABC, abstractmethod
 
@@ -71,6 +72,7 @@ class ModelGenericRadio(IModel, ABC):
     # model operation specific variables
     _radioID: int
     _rxQueue: Queue                # received packet queue
+    _rxDeque: deque                # deque backing the received packet queue
     _txQueue: Queue                # packets to be transmitted
     _selfCtrl: bool                # decides whether the frame queues are handled in the Execute() method by itself or externally
 
@@ -142,7 +144,7 @@ class ModelGenericRadio(IModel, ABC):
             _pickledPacket = _kwargs['_packet']
             _packet = pickle.loads(_pickledPacket)
             
-            self._rxQueue.put(_packet)
+            self._rxDeque.append(_packet)
             self._rxCounter += 1
             self._log_Action("received", _packet)
             return True
@@ -217,12 +219,34 @@ class ModelGenericRadio(IModel, ABC):
         if self._rxCounter == 0:
             return None
         else:
-            _ret = self._rxQueue.get()
+            _ret = self._rxDeque.popleft()
             self._log_Action("dequeued", _ret)
             self._rxCounter -= 1
             
             return _ret    
         
+    def _get_AllReceivedPackets(self, **_kwargs):
+        '''
+        @desc
+            This method drains the Rx queue in one go and returns all the packets in it
+        @param[in]  _kwargs
+            keyworded arguments that should contain the following arguments
+            None for this API
+        @return
+            List of the packets in the Rx queue in the order of reception. Empty list if there is no packet
+        '''
+        if self._rxCounter == 0:
+            return []
+        
+        _popleft = self._rxDeque.popleft
+        _ret = [_popleft() for _ in range(self._rxCounter)]
+        
+        for _packet in _ret:
+            self._log_Action("dequeued", _packet)
+            self._rxCounter -= 1
+        
+        return _ret
+        
     def _send_Packet(self, **_kwargs):
         """
         @desc
@@ -385,6 +409,18 @@ class ModelGenericRadio(IModel, ABC):
         """
         return self._rxCounter
     
+    def is_RxQueueEmpty(self, **_kwargs) -> bool:
+        """
+        @desc
+            This method tells whether the Rx queue is empty. It is cheaper than fetching the packets when there is none
+        @param[in]  _kwargs
+            keyworded arguments that should contain the following arguments
+            None for this method
+        @return
+            True: If there is no packet in the Rx queue. False: Otherwise
+        """
+        return self._rxCounter == 0
+    
     def get_TxQueueSize(self, **_kwargs):
         """
         @desc
@@ -405,8 +441,10 @@ class ModelGenericRadio(IModel, ABC):
         "get_RxQueue": _get_RxQueue,
         "get_TxQueue": _get_TxQueue,
         "get_RxQueueSize": get_RxQueueSize,
+        "is_RxQueueEmpty": is_RxQueueEmpty,
         "get_TxQueueSize": get_TxQueueSize,
         "get_ReceivedPacket": _get_ReceivedPacket,
+        "get_AllReceivedPackets": _get_AllReceivedPackets,
         
         "turn_RXOn": _turn_RXOn,
         "turn_RXOff": _turn_RXOff,
@@ -427,6 +465,10 @@ class ModelGenericRadio(IModel, ABC):
         @param[in]  _object
             The object on which the action was taken
         '''
+        #Collecting the details below scans the channels. So, skip it all if the log would be dropped anyway
+        if not self._logInfoEnabled:
+            return
+        
         #Let's get the type of the object, i.e. if it's a mac unit, data unit, etc.
         _objectType = type(_object).__name__
         
@@ -499,10 +541,16 @@ class ModelGenericRadio(IModel, ABC):
 
         self._ownernode = _ownernodeins
         self._logger = _loggerins
+        #the log level does not change during the simulation. So, whether the info logs are written is checked once
+        self._logInfoEnabled = _loggerins.is_LogTypeEnabled(ELogType.LOGINFO)
 
         self._radioID = _radioID
 
         self._rxQueue = Queue(maxsize= _queueSize)
+        #The model bounds the Rx queue with its own counter and never waits on it. 
+        #So, it works on the deque backing the queue directly and skips the locking of Queue.put/get. 
+        #The Queue itself is still what get_RxQueue hands out
+        self._rxDeque = self._rxQueue.queue
         self._txQueue = Queue(maxsize= _queueSize)
 
         self._selfCtrl = _selfCtrl
@@ -9,10 +9,11 @@ This model is a superclass for all the MAC unit
 """
 
 from dataclasses import dataclass, field
+from itertools import count
+from typing import ClassVar
 from src.utils import Time
-import threading
 
-@dataclass
+@dataclass(slots=True)
 class GenericMAC:
     # Time when the data unit was created
     creationTime: Time
@@ -29,21 +30,71 @@ class GenericMAC:
     # Sequence number of the data unit
     sequenceNumber: int
     
-    # Incremented every time a new data unit is created
+    # Number of MAC units created so far, taken right after this unit was created
     globalMACIDCounter: int = field(init=False, default=0)
     
     # Unique ID of the MAC unit
     id : int = field(init=False)
     
+    # Source of the unique IDs. Drawing from it is atomic, so no lock is needed
+    macIDSource: ClassVar[count] = count()
+    
     @property
     def maxsize(self):
         # Override this property in the subclass
         return 0
     
+    def renew_ID(self) -> None:
+        """
+        @desc
+            This method gives the MAC unit a new unique ID. 
+            It is used when a MAC unit instance is reused for a new transmission
+        """
+        self.id = next(GenericMAC.macIDSource)
+        self.globalMACIDCounter = self.id + 1
+    
+    @classmethod
+    def new_Unit(
+            cls,
+            _creationTime: Time,
+            _sourceRadioID: int,
+            _intendedRadioID: int,
+            _sequenceNumber: int,
+            _size: int,
+            /) -> 'GenericMAC':
+        """
+        @desc
+            This method creates a MAC unit of the calling subclass without going through the keyword arguments of the generated constructor.
+            It fills the fields of GenericMAC and does the same checks as __post_init__. The subclass fills its own fields afterwards
+        @param[in] _creationTime
+            Time when the data unit was created
+        @param[in] _sourceRadioID
+            ID of the radio which created the data unit
+        @param[in] _intendedRadioID
+            ID of the radio intended to receive the data unit. -1 if broadcast
+        @param[in] _sequenceNumber
+            Sequence number of the data unit
+        @param[in] _size
+            Size of the data unit in bytes
+        @return
+            The new MAC unit
+        """
+        _unit = object.__new__(cls)
+        _unit.creationTime = _creationTime
+        _unit.sourceRadioID = _sourceRadioID
+        _unit.size = _size
+        _unit.intendedRadioID = _intendedRadioID
+        _unit.sequenceNumber = _sequenceNumber
+        _unit.maxsize = cls.__dataclass_fields__["maxsize"].default
+        
+        if _size > _unit.maxsize:
+            raise Exception("Size of the MAC unit cannot be greater than the max size")
+        
+        _unit.renew_ID()
+        return _unit
+    
     def __post_init__(self) -> None:
-        with threading.Lock():
-            self.id = GenericMAC.globalMACIDCounter
-            GenericMAC.globalMACIDCounter += 1
+        self.renew_ID()
             
         if self.size > self.maxsize:
             raise Exception("Size of the MAC unit cannot be greater than the max size")
@@ -10,10 +10,34 @@ This model represents an ack data unit.
 
 from dataclasses import dataclass, field
 from src.models.network.macdata.genericmac import GenericMAC
+from src.utils import Time
 
-@dataclass
+@dataclass(slots=True)
 class MACAck(GenericMAC):
     receivedMACDataID: int
     
     maxsize: int = field(init=False, default=255-4) # 255 bytes - 4 bytes for header
-    
\ No newline at end of file
+    
+    @classmethod
+    def new_Fast(
+            cls,
+            _creationTime: Time,
+            _sourceRadioID: int,
+            _intendedRadioID: int,
+            _sequenceNumber: int,
+            _receivedMACDataID: int,
+            _size: int = 4,
+            /) -> 'MACAck':
+        """
+        @desc
+            This method creates a MACAck through GenericMAC.new_Unit. See it for the common parameters
+        @param[in] _receivedMACDataID
+            ID of the acknowledged MACData unit
+        @param[in] _size
+            Size of the data unit in bytes. Defaults to the fixed size the MAC models use for this unit
+        @return
+            The new MACAck instance
+        """
+        _unit = cls.new_Unit(_creationTime, _sourceRadioID, _intendedRadioID, _sequenceNumber, _size)
+        _unit.receivedMACDataID = _receivedMACDataID
+        return _unit
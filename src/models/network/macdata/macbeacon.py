@@ -11,7 +11,7 @@ This model represents a beacon data unit which a satellite node broadcasts to al
 from dataclasses import dataclass, field
 from src.models.network.macdata.genericmac import GenericMAC
 
-@dataclass
+@dataclass(slots=True)
 class MACBeacon(GenericMAC):
     # TODO: match the beacon data unit with the data from tinygs
     numDevicesInView: int = 0
@@ -9,10 +9,35 @@ This model represents an ack data unit.
 """
 
 from dataclasses import dataclass, field
-from src.models.network.macdata.genericmac import GenericMAC 
+from src.models.network.macdata.genericmac import GenericMAC
+from src.utils import Time
 
-@dataclass
+@dataclass(slots=True)
 class MACControl(GenericMAC):
     numPacketsToSend: int
     
-    maxsize: int = field(init=False, default=255-4) # 255 bytes - 4 bytes for header
\ No newline at end of file
+    maxsize: int = field(init=False, default=255-4) # 255 bytes - 4 bytes for header
+    
+    @classmethod
+    def new_Fast(
+            cls,
+            _creationTime: Time,
+            _sourceRadioID: int,
+            _intendedRadioID: int,
+            _sequenceNumber: int,
+            _numPacketsToSend: int,
+            _size: int = 8,
+            /) -> 'MACControl':
+        """
+        @desc
+            This method creates a MACControl through GenericMAC.new_Unit. See it for the common parameters
+        @param[in] _numPacketsToSend
+            Number of packets the receiver wants the sender to send
+        @param[in] _size
+            Size of the data unit in bytes. Defaults to the fixed size the MAC models use for this unit
+        @return
+            The new MACControl instance
+        """
+        _unit = cls.new_Unit(_creationTime, _sourceRadioID, _intendedRadioID, _sequenceNumber, _size)
+        _unit.numPacketsToSend = _numPacketsToSend
+        return _unit
@@ -10,10 +10,40 @@ This model represents a mac layer packet which holds data
 
 from dataclasses import dataclass, field
 from src.models.network.macdata.genericmac import GenericMAC
+from src.utils import Time
 
-@dataclass
+@dataclass(slots=True)
 class MACData(GenericMAC):
-    dataPayloadString: str
+    # The data object carried by this MAC unit. 
+    # The whole MAC unit is pickled by the radio on transmission, so the receiver gets its own copy of the payload
+    dataPayload: object = None
+    
+    # Serialized form of the payload. Not filled by the MAC models anymore as the payload is carried as is
+    dataPayloadString: bytes = None
 
     maxsize: int = field(init=False, default=255-4) # 255 bytes - 4 bytes for header
-     
\ No newline at end of file
+    
+    @classmethod
+    def new_Fast(
+            cls,
+            _creationTime: Time,
+            _sourceRadioID: int,
+            _intendedRadioID: int,
+            _sequenceNumber: int,
+            _dataPayload: object,
+            _size: int,
+            /) -> 'MACData':
+        """
+        @desc
+            This method creates a MACData through GenericMAC.new_Unit. See it for the common parameters
+        @param[in] _dataPayload
+            The data object carried by the data unit
+        @param[in] _size
+            Size of the data unit in bytes
+        @return
+            The new MACData instance
+        """
+        _unit = cls.new_Unit(_creationTime, _sourceRadioID, _intendedRadioID, _sequenceNumber, _size)
+        _unit.dataPayload = _dataPayload
+        _unit.dataPayloadString = None
+        return _unit
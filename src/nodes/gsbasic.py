@@ -145,6 +145,9 @@ class GSBasic(INode):
         assert _modelsToAdd is not None
 
         self.__models.extend(_modelsToAdd)
+        for _model in _modelsToAdd:
+            #the first model with a name is the one found by name, as the models were searched in order before
+            self.__nameToModels.setdefault(_model.iName, _model)
     
     def has_ModelWithTag(
             self, 
@@ -190,14 +193,7 @@ class GSBasic(INode):
             Instance of the model if it was found.
             Otherwise, None 
         """
-        _ret = None
-
-        for _model in self.__models:
-            if _model.iName == _modelName:
-                _ret = _model
-                break
-        
-        return _ret
+        return self.__nameToModels.get(_modelName, None)
 
     def update_Position(
             self, 
@@ -316,6 +312,7 @@ class GSBasic(INode):
         self.__endTimeStamp = _endtime
         self.__logger = _Logger
         self.__models = []
+        self.__nameToModels = {} #models keyed by their implementation name (iName)
     
     def Execute(self) -> bool:
         """
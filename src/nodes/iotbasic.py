@@ -146,6 +146,8 @@ class IoTBasic(INode):
         self.__models.extend(_modelsToAdd)
         for _model in _modelsToAdd:
             self.__tagToModel[_model.modelTag] = _model
+            #the first model with a name is the one found by name, as the models were searched in order before
+            self.__nameToModels.setdefault(_model.iName, _model)
             
     def has_ModelWithTag(
             self, 
@@ -184,14 +186,7 @@ class IoTBasic(INode):
             Instance of the model if it was found.
             Otherwise, None 
         """
-        _ret = None
-
-        for _model in self.__models:
-            if _model.iName == _modelName:
-                _ret = _model
-                break
-        
-        return _ret
+        return self.__nameToModels.get(_modelName, None)
 
     def update_Position(
             self, 
@@ -306,6 +301,7 @@ class IoTBasic(INode):
         self.__endTimeStamp = _endtime.copy()
         self.__logger = _Logger
         self.__models = []
+        self.__nameToModels = {} #models keyed by their implementation name (iName)
         
         self.__lat, self.__lon, self.__alt = _location.to_lat_long() #Saves us from calling the function again and again
         self.__tagToModel = {}
@@ -10,6 +10,8 @@ This module includes the interface implementation of topology.
 
 from abc import ABC, abstractmethod
 from src.nodes.inode import INode, ENodeType
+from src.utils import Time
+import numpy as np
 
 class ITopology(ABC):
     """
@@ -88,3 +90,24 @@ class ITopology(ABC):
             All the nodes of this topology instance
         '''
         pass
+    
+    @abstractmethod
+    def get_Positions_At(
+            self, 
+            _time: Time, 
+            _mask: np.ndarray = None, 
+            _out: np.ndarray = None) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        @desc
+            Get the position vectors of the nodes of this topology at the time provided in the argument in a single batch
+        @param[in]  _time
+            The time at which the positions are being looked for
+        @param[in]  _mask
+            Boolean mask over the node list. Only the positions of the nodes selected by it are fetched. All the nodes by default
+        @param[out]  _out
+            Optional (k, 3) or larger array to write the positions into
+        @return
+            A tuple of the (k, 3) array of the position vectors and the boolean mask of the k nodes over the node list.
+            The nodes not having a position at the time are left out from both.
+        '''
+        pass
@@ -181,6 +181,8 @@ class SatelliteBasic(INode):
         self.__models.extend(_modelsToAdd)
         for _model in _modelsToAdd:
             self.__tagToModels[_model.modelTag] = _model
+            #the first model with a name is the one found by name, as the models were searched in order before
+            self.__nameToModels.setdefault(_model.iName, _model)
     
     def has_ModelWithTag(
             self, 
@@ -210,14 +212,7 @@ class SatelliteBasic(INode):
             Instance of the model if it was found.
             Otherwise, None 
         """
-        _ret = None
-
-        for _model in self.__models:
-            if _model.iName == _modelName:
-                _ret = _model
-                break
-        
-        return _ret
+        return self.__nameToModels.get(_modelName, None)
     
     def get_Models(self) -> 'list[IModel]':
         """
@@ -339,6 +334,7 @@ class SatelliteBasic(INode):
         self.__endTimeStamp = _endtime
         self.__logger = _Logger
         self.__models = []
+        self.__nameToModels = {} #models keyed by their implementation name (iName)
         self.__positionDictionary = dict()
         self.__tagToModels = {}
     
@@ -8,9 +8,14 @@ Created on: 12 Oct 2022
     This module implements the Topology class that inherits the ITopology
 '''
 from io import StringIO
+import threading
 
+import numpy as np
+
+from src.models.imodel import EModelTag
 from src.nodes.inode import ENodeType, INode
 from src.nodes.itopology import ITopology
+from src.utils import Time
 
 class Topology(ITopology):
     '''
@@ -55,6 +60,9 @@ class Topology(ITopology):
                 self.__nodeIDToNodeMap[_node.nodeID] = _node
             else:
                 raise Exception("Node ID already exists in the topology")
+            
+            # the node list has changed. So the position slab has to be built again
+            self.__positions = None
     
     def get_Node(
             self, 
@@ -96,6 +104,66 @@ class Topology(ITopology):
         '''
         return self.__nodes
     
+    def get_Positions_At(
+            self, 
+            _time: Time, 
+            _mask: np.ndarray = None, 
+            _out: np.ndarray = None) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        @desc
+            Get the position vectors of the nodes of this topology at the time provided in the argument in a single batch.
+            The positions are kept in a (N, 3) slab indexed as the node list. 
+            A node having an orbital model moves, so its position is fetched again whenever the time changes.
+            The positions of the other nodes are fetched only once.
+        @param[in]  _time
+            The time at which the positions are being looked for
+        @param[in]  _mask
+            Boolean mask over the node list. Only the positions of the nodes selected by it are fetched. All the nodes by default
+        @param[out]  _out
+            Optional (k, 3) or larger array to write the positions into
+        @return
+            A tuple of the (k, 3) array of the position vectors and the boolean mask of the k nodes over the node list.
+            The nodes not having a position at the time are left out from both.
+        '''
+        # The nodes of a topology can be executed by several worker threads. So the slab is refreshed and gathered under a lock
+        with self.__positionLock:
+            if self.__positions is None:
+                self.__build_PositionSlab()
+            
+            if _mask is None:
+                _mask = np.ones(len(self.__nodes), dtype=bool)
+            
+            if self.__positionTime is None or not (self.__positionTime == _time):
+                # the time has changed. So the positions of the moving nodes are stale
+                self.__positionFetched[self.__isMobile] = False
+                self.__positionTime = _time.copy()
+            
+            for _index in np.nonzero(_mask & ~self.__positionFetched)[0]:
+                _position = self.__nodes[_index].get_Position(_time)
+                self.__positionFetched[_index] = True
+                self.__positionKnown[_index] = _position is not None
+                if _position is not None:
+                    self.__positions[_index] = _position.to_tuple()
+            
+            _selected = _mask & self.__positionKnown
+            _numOfSelected = int(np.count_nonzero(_selected))
+            if _out is not None:
+                _out = _out[:_numOfSelected]
+            
+            return np.compress(_selected, self.__positions, axis = 0, out = _out), _selected
+    
+    def __build_PositionSlab(self):
+        '''
+        @desc
+            Builds the position slab of the nodes and the flags telling which nodes move
+        '''
+        _numOfNodes = len(self.__nodes)
+        self.__isMobile = np.fromiter((_node.has_ModelWithTag(EModelTag.ORBITAL) is not None for _node in self.__nodes), dtype=bool, count=_numOfNodes)
+        self.__positions = np.zeros((_numOfNodes, 3)) # position vectors of the nodes
+        self.__positionFetched = np.zeros(_numOfNodes, dtype=bool) # whether the position has been fetched for the cached time
+        self.__positionKnown = np.zeros(_numOfNodes, dtype=bool) # whether the node returned a position
+        self.__positionTime = None
+    
     def __init__(
             self, 
             _name: str, 
@@ -112,6 +180,10 @@ class Topology(ITopology):
         self.__id = _id
         self.__nodes = []
         self.__nodeIDToNodeMap = {}
+        
+        # position slab of the nodes. See get_Positions_At()
+        self.__positions = None
+        self.__positionLock = threading.Lock()
     
     def __str__(self) -> str:
         '''
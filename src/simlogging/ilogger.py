@@ -40,6 +40,21 @@ class ILogger(ABC):
         '''
         pass
     
+    @abstractmethod
+    def is_LogTypeEnabled(
+            self, 
+            _logType: ELogType) -> bool:
+        '''
+        @desc
+            This method tells whether a log message of the type passed in the argument would be handled by this logger.
+            It can be used to skip building an expensive log message that would be discarded anyway.
+        @param[in]  _logType
+            Type of the log message
+        @return
+            True if the log type is handled, False otherwise
+        '''
+        pass
+    
     @abstractmethod
     def write_Log(
             self, 
@@ -19,6 +19,20 @@ class LoggerCmd(ILogger):
    __loggeneratorname: str
    __logTypeLevel: ELogType
 
+   def is_LogTypeEnabled(
+        self, 
+        _logType: ELogType) -> bool:
+        '''
+        @desc
+            This method tells whether a log message of the type passed in the argument would be handled by this logger
+        @param[in]  _logType
+            Type of the log message
+        @return
+            True if the log type is handled, False otherwise
+        '''
+        return (self.__logTypeLevel == ELogType.LOGALL or 
+                self.__logTypeLevel == _logType)
+   
    def write_Log(
         self, 
         _message: str, 
@@ -39,8 +53,7 @@ class LoggerCmd(ILogger):
         '''
         _ret = False
         #check whether the log type of the message can be handled by this logger instance
-        if (self.__logTypeLevel == ELogType.LOGALL or 
-            self.__logTypeLevel == _logType):
+        if self.is_LogTypeEnabled(_logType):
                 _logMessage = "".join(["[", _logType.__str__(), "]", ", ",
                                 self.__loggeneratorname, ", ",
                                 (_timeStamp.to_str() if _timeStamp is not None else "NTA"), ", ", 
@@ -21,6 +21,20 @@ class LoggerFile(ILogger):
     __filePath: str
     __logTypeLevel: ELogType
         
+    def is_LogTypeEnabled(
+        self, 
+        _logType: ELogType) -> bool:
+        '''
+        @desc
+            This method tells whether a log message of the type passed in the argument would be handled by this logger
+        @param[in]  _logType
+            Type of the log message
+        @return
+            True if the log type is handled, False otherwise
+        '''
+        return (self.__logTypeLevel == ELogType.LOGALL or
+                self.__logTypeLevel.value >= _logType.value)
+    
     def write_Log(
         self, 
         _message: str, 
@@ -45,8 +59,7 @@ class LoggerFile(ILogger):
         #print(self.__logTypeLevel, _logType, self.__logTypeLevel.value, _logType.value, self.__logTypeLevel.value >= _logType.value)
         
         #check whether the log type of the message can be handled by this logger instance
-        if (self.__logTypeLevel == ELogType.LOGALL or
-            self.__logTypeLevel.value >= _logType.value):
+        if self.is_LogTypeEnabled(_logType):
             #check whether log directory exists
             if(os.path.isfile(self.__filePath)):
                 try:
@@ -35,6 +35,20 @@ class LoggerFileChunkwise(ILogger):
    
    __overwritePermission: bool = False # whether all the log files can be overwritten without asking the user
    
+   def is_LogTypeEnabled(
+        self, 
+        _logType: ELogType) -> bool:
+        '''
+        @desc
+            This method tells whether a log message of the type passed in the argument would be handled by this logger
+        @param[in]  _logType
+            Type of the log message
+        @return
+            True if the log type is handled, False otherwise
+        '''
+        return (self.__logTypeLevel == ELogType.LOGALL or self.__logTypeLevel == _logType or
+                self.__logTypeLevel.value >= _logType.value)
+   
    def write_Log(
         self, 
         _message: str, 
@@ -55,8 +69,7 @@ class LoggerFileChunkwise(ILogger):
         '''
         _ret = False
         #check whether the log type of the message can be handled by this logger instance
-        if (self.__logTypeLevel == ELogType.LOGALL or self.__logTypeLevel == _logType or
-            self.__logTypeLevel.value >= _logType.value):
+        if self.is_LogTypeEnabled(_logType):
             
             if "\"" in _message:
                 raise Exception("[Simulator Exception] Log message can't contain double quote (\") character. Write the log message without double quote.")
@@ -24,6 +24,14 @@ class TestLoggerFile(unittest.TestCase):
             if(i%10 == 0):
                 self.assertTrue(__result)
         
+    def test_IsLogTypeEnabled(self):
+        self.assertTrue(self.__logger.is_LogTypeEnabled(ELogType.LOGDEBUG))
+        
+        _logger = LoggerFile(ELogType.LOGINFO, "TestFileLogger", os.getcwd())
+        self.assertTrue(_logger.is_LogTypeEnabled(ELogType.LOGERROR))
+        self.assertFalse(_logger.is_LogTypeEnabled(ELogType.LOGDEBUG))
+        self.assertFalse(_logger.write_Log("Test log", ELogType.LOGDEBUG))
+        
     def tearDown(self) -> None:
         _path = os.path.join(os.getcwd(), "Log_TestFileLogger.log")
         if os.path.isfile(_path):
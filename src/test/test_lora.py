@@ -72,6 +72,30 @@ class testloraradiomodel(unittest.TestCase):
         self.assertEqual(self.__rxQueues[1].qsize(), 0)
         self.assertEqual(self.__rxQueues[2].qsize(), 0)
     
+    def test_getAllReceivedPackets(self) -> None:
+        # Let's check that the whole Rx queue is drained in one go
+        self.assertTrue(self.__models[1].call_APIs("is_RxQueueEmpty"))
+        self.assertEqual(self.__models[1].call_APIs("get_AllReceivedPackets"), [])
+        
+        _sentFrames = [Frame(0, 10, payloadString="Test1"), Frame(0, 10, payloadString="Test2")]
+        for _frame in _sentFrames:
+            self.__models[0].call_APIs("add_PacketToTransmit", _packet=_frame)
+        
+        for i in range(6):
+            self.nextStep()
+        
+        self.assertEqual(self.__rxQueues[1].qsize(), 2)
+        self.assertEqual(self.__models[1].call_APIs("get_RxQueueSize"), 2)
+        self.assertFalse(self.__models[1].call_APIs("is_RxQueueEmpty"))
+        
+        _received = self.__models[1].call_APIs("get_AllReceivedPackets")
+        self.assertListEqual(_received, _sentFrames)
+        
+        self.assertEqual(self.__rxQueues[1].qsize(), 0)
+        self.assertEqual(self.__models[1].call_APIs("get_RxQueueSize"), 0)
+        self.assertTrue(self.__models[1].call_APIs("is_RxQueueEmpty"))
+        self.assertEqual(self.__models[1].call_APIs("get_ReceivedPacket"), None)
+    
     def test_collision(self) -> None:
         #lets check that if we transmit from node 1 and node 2 to node 0, we get a collision
         self.assertEqual(self.__rxQueues[0].qsize(), 0)
@@ -16,6 +16,8 @@ from src.sim.managerparallel import ManagerParallel
 from src.models.imodel import IModel, EModelTag
 from src.nodes.itopology import ITopology
 from src.nodes.inode import ENodeType
+from src.models.models_fov.modelhelperfov import compute_DownViewElevations, compute_UpViewElevations
+import numpy as np
 
 class TestModelHelperFoV(unittest.TestCase):
     def setUp(self) -> None:
@@ -65,4 +67,48 @@ class TestModelHelperFoV(unittest.TestCase):
         
         for i in range(len(_desiredResult)):
             if _desiredResult[i][1] > 0:
-                self.assertIn(_desiredResult[i][0], _result)
\ No newline at end of file
+                self.assertIn(_desiredResult[i][0], _result)
+
+    def test_compute_DownViewElevations(self):
+        _viewerLocation = np.array([7.0e6, 1.0e5, -2.0e5])
+        _targetLocations = np.array([[6.371e6, 0.0, 0.0],
+                                    [0.0, 6.371e6, 0.0],
+                                    [4.5e6, 4.5e6, 0.0]])
+
+        # reference computation through the unit vectors
+        _delta = _viewerLocation - _targetLocations
+        _desiredResult = np.degrees(np.arcsin(np.sum(
+                                        (_delta / np.linalg.norm(_delta, axis=1)[:, None]) * 
+                                        (_targetLocations / np.linalg.norm(_targetLocations, axis=1)[:, None]), axis=1)))
+        
+        _result = compute_DownViewElevations(_viewerLocation, _targetLocations)
+        np.testing.assert_allclose(_result, _desiredResult)
+
+    def test_compute_UpViewElevations(self):
+        _viewerLocation = np.array([6.371e6, 0.0, 0.0])
+        _targetLocations = np.array([[7.0e6, 1.0e5, -2.0e5],
+                                    [0.0, 7.0e6, 0.0],
+                                    [5.0e6, 5.0e6, 0.0]])
+
+        # reference computation through the unit vectors
+        _delta = _targetLocations - _viewerLocation
+        _desiredResult = np.degrees(np.arcsin(np.dot(
+                                        _delta / np.linalg.norm(_delta, axis=1)[:, None], 
+                                        _viewerLocation / np.linalg.norm(_viewerLocation))))
+        
+        # the target locations are overwritten by the function. So a copy is passed
+        _result = compute_UpViewElevations(_viewerLocation, _targetLocations.copy())
+        np.testing.assert_allclose(_result, _desiredResult)
+
+    def test_get_Positions_At(self):
+        _topology = self.__topologies[0]
+        _time = _topology.nodes[0].timestamp
+        _mask = np.array([_node.nodeType == ENodeType.GS for _node in _topology.nodes])
+
+        _positions, _selected = _topology.get_Positions_At(_time, _mask)
+        _desiredNodes = [_node for _node in _topology.nodes if _node.nodeType == ENodeType.GS]
+        
+        self.assertEqual(_positions.shape, (len(_desiredNodes), 3))
+        self.assertListEqual(np.nonzero(_selected)[0].tolist(), np.nonzero(_mask)[0].tolist())
+        for _position, _node in zip(_positions, _desiredNodes):
+            np.testing.assert_allclose(_position, _node.get_Position(_time).to_tuple())
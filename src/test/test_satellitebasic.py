@@ -15,7 +15,10 @@ from src.simlogging.ilogger import ELogType, ILogger
 from src.simlogging.loggercmd import LoggerCmd
 from src.nodes.satellitebasic import SatelliteBasic
 from src.utils import Location, Time
-from src.models.models_orbital.modelorbit import ModelOrbit
+from src.models.models_orbital.modelorbit import ModelOrbit, _is_SunlitApprox, _load_SharedEphemeris
+from skyfield.api import load, EarthSatellite
+from sgp4.api import jday
+import numpy as np
 
 class TestSatelliteBasic(unittest.TestCase):
 
@@ -59,4 +62,21 @@ class TestSatelliteBasic(unittest.TestCase):
 
         self.assertEqual(_lat, 1.0)
         self.assertEqual(_long, 2.0)
-        self.assertEqual(_elv, 3.0)
\ No newline at end of file
+        self.assertEqual(_elv, 3.0)
+
+    def test_SunlitApprox(self):
+        _tlelines = ["1 50985U 22002B   22290.71715197  .00032099  00000+0  13424-2 0  9994", "2 50985  97.4784 357.5505 0011839 353.6613   6.4472 15.23462773 42039"]
+        _satellite = EarthSatellite(_tlelines[0], _tlelines[1])
+        _seconds = np.arange(0, 86400, 10)
+        _julianDay, _dayFraction = jday(2022, 10, 11, 12, 0, 0)
+        _dayFractions = _dayFraction + _seconds / 86400.0
+        
+        _desiredResult = _satellite.at(load.timescale().utc(2022, 10, 11, 12, 0, _seconds)).is_sunlit(_load_SharedEphemeris())
+        _, _positions, _ = _satellite.model.sgp4_array(np.full(_dayFractions.shape, _julianDay), _dayFractions)
+        _result = _is_SunlitApprox(_positions.T, _julianDay + _dayFractions)
+        
+        #The closed form test may only disagree at the sample next to a switch of skyfield's status
+        _switches = np.nonzero(np.diff(_desiredResult))[0]
+        for _index in np.nonzero(_result != _desiredResult)[0]:
+            self.assertLessEqual(np.min(np.abs(_switches - _index)), 1)
+        self.assertGreater(len(_switches), 0)
@@ -4,6 +4,7 @@
 '''
 
 from datetime import datetime, timedelta, timezone
+import math
 from typing import Tuple, List
 
 from astropy.coordinates import EarthLocation, ITRS, AltAz, CIRS # type: ignore
@@ -235,7 +236,8 @@ class Location:
         Returns:
             float - (distance in m)
         """
-        return float(np.sqrt( (self.x - other.x)** 2 + (self.y - other.y)** 2 + (self.z - other.z)** 2 ))
+        #math.sqrt works on the scalars directly and rounds the same as np.sqrt without creating a numpy scalar
+        return math.sqrt( (self.x - other.x)** 2 + (self.y - other.y)** 2 + (self.z - other.z)** 2 )
     
     @staticmethod
     def multiple_to_lat_long(locs: 'List[Location]') -> 'Tuple[List[float], List[float], List[float]]':